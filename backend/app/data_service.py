@@ -1,13 +1,49 @@
 import json
 import os
-from typing import List, Dict, Any
-from .models import Holding, Allocation, AllocationItem, Performance, TimelinePoint, Returns, Summary, TopPerformer
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Callable
+from .models import Holding, Allocation, AllocationItem, Performance, TimelinePoint, Returns, Summary, TopPerformer, SearchResult, FXRates, HoldingsDelta, PerformanceDelta
+from .search_index import HoldingsIndex
+from .sqlite_store import SQLitePortfolioStore, SORTABLE_COLUMNS
+from .fx_service import FXRateTable, HoldingAmounts, MONETARY_FIELDS, currency_for
+from .sync_service import ChangeLog
 
 class PortfolioDataService:
     def __init__(self):
         self.data_path = os.path.join(os.path.dirname(__file__), '..', 'data')
         self.json_file = os.path.join(self.data_path, 'portfolio_data.json')
         self._portfolio_data = None
+        self._holdings_index = None
+        self._holding_amounts = None
+        
+        # Storage backend: "json" (default, whole document in memory) or "sqlite"
+        self.storage = os.getenv("PORTFOLIO_STORAGE", "json").lower()
+        self._store = None
+        if self.storage == "sqlite":
+            db_file = os.getenv("PORTFOLIO_DB", os.path.join(self.data_path, 'portfolio_data.db'))
+            self._store = SQLitePortfolioStore(db_file, pool_size=int(os.getenv("PORTFOLIO_DB_POOL_SIZE", 4)))
+        
+        # FX rates for converting values into a reporting currency
+        self.fx = FXRateTable(
+            os.getenv("FX_RATES_FILE", os.path.join(self.data_path, 'fx_rates.json')),
+            os.getenv("FX_RATES_OVERRIDE_FILE", os.path.join(self.data_path, 'fx_rates.local.json'))
+        )
+        
+        # Converted results cached per (snapshot, FX version, currency); the
+        # snapshot id is bumped on every reload
+        self._snapshot_id = 0
+        self._fx_cache_key = None
+        self._fx_cache: Dict[Tuple[str, str], Any] = {}
+        
+        # Snapshot versions and recent changes for `?since=` delta polling
+        self._changes = ChangeLog(max_changes=int(os.getenv("PORTFOLIO_SYNC_HISTORY", 64)),
+                                  max_rows=int(os.getenv("PORTFOLIO_SYNC_MAX_ROWS", 100_000)))
+        self._versioned_key = None
+        
+        # Lazy per-snapshot builds are O(N); threadpool requests arriving
+        # together must not each repeat them
+        self._build_lock = threading.Lock()
+        self._version_lock = threading.Lock()
         
     def _load_portfolio_data(self) -> Dict[str, Any]:
         """Load portfolio data from JSON file"""
@@ -61,40 +97,256 @@ class PortfolioDataService:
             'summary_metrics': {}
         }
     
-    def get_holdings(self) -> List[Holding]:
-        """Get enriched holdings with calculated values"""
+    def _to_holding(self, holding_dict: Dict[str, Any]) -> Holding:
+        """Create a Holding from a JSON holding record"""
+        # The JSON already has calculated values, just create the Holding object
+        return Holding(
+            symbol=holding_dict['symbol'],
+            name=holding_dict['name'],
+            quantity=holding_dict['quantity'],
+            avgPrice=holding_dict['avgPrice'],
+            currentPrice=holding_dict['currentPrice'],
+            sector=holding_dict['sector'],
+            marketCap=holding_dict['marketCap'],
+            listingCurrency=currency_for(holding_dict),
+            value=holding_dict.get('value', holding_dict['quantity'] * holding_dict['currentPrice']),
+            gainLoss=holding_dict.get('gainLoss', 0),
+            gainLossPercent=holding_dict.get('gainLossPercent', 0)
+        )
+    
+    def _cached(self, kind: str, currency: str, compute: Callable[[], Any]) -> Any:
+        """Return a converted result for the current snapshot and FX version, computing it once"""
+        key = (self._snapshot_id, self.fx.version)
+        if self._fx_cache_key != key:
+            self._fx_cache = {}
+            self._fx_cache_key = key
+        if (kind, currency) not in self._fx_cache:
+            self._fx_cache[(kind, currency)] = compute()
+        return self._fx_cache[(kind, currency)]
+    
+    def _get_holding_amounts(self) -> HoldingAmounts:
+        """Numpy amount columns of the JSON holdings, built once per snapshot"""
         portfolio_data = self._load_portfolio_data()
-        holdings_data = portfolio_data.get('holdings', [])
+        if self._holding_amounts is None or self._holding_amounts[0] is not portfolio_data:
+            with self._build_lock:
+                if self._holding_amounts is None or self._holding_amounts[0] is not portfolio_data:
+                    self._holding_amounts = (portfolio_data, HoldingAmounts(portfolio_data.get('holdings', [])))
+        return self._holding_amounts[1]
+    
+    def _converted_amounts(self, currency: str) -> Any:
+        """JSON holding amounts in the reporting currency (the unconverted matrix if nothing needed converting)"""
+        amounts = self._get_holding_amounts()
+        return self._cached('amounts', currency, lambda: self.fx.convert_amounts(amounts, currency))
+    
+    def _converted_record(self, holding_dict: Dict[str, Any], converted: Any, position: int) -> Dict[str, Any]:
+        """A JSON holding record with amounts from a converted matrix row, rounded for output"""
+        if converted is self._get_holding_amounts().matrix:
+            return holding_dict
+        return {**holding_dict, **dict(zip(MONETARY_FIELDS, converted[position].round(2).tolist()))}
+    
+    def _get_holdings_index(self) -> HoldingsIndex:
+        """Get the lookup index, rebuilding only when the snapshot changes"""
+        # The SQLite snapshot only changes through an import followed by reload_data()
+        source = self._store if self._store is not None else self._load_portfolio_data()
+        if self._holdings_index is None or self._holdings_index[0] is not source:
+            with self._build_lock:
+                if self._holdings_index is None or self._holdings_index[0] is not source:
+                    if self._store is not None:
+                        rows = self._store.iter_index_rows()
+                    else:
+                        rows = ((h['symbol'], h.get('name', ''), h.get('sector', '')) for h in source.get('holdings', []))
+                    self._holdings_index = (source, HoldingsIndex(rows))
+                    print(f"🔎 Built holdings lookup index ({len(self._holdings_index[1])} symbols)")
+        return self._holdings_index[1]
+    
+    def get_holdings(self, sector: Optional[str] = None, market_cap: Optional[str] = None,
+                     sort_by: Optional[str] = None, descending: bool = False,
+                     limit: Optional[int] = None, offset: int = 0,
+                     currency: Optional[str] = None) -> List[Holding]:
+        """Get enriched holdings with calculated values, optionally filtered, sorted and paginated"""
+        if sort_by is not None and sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by: {sort_by}")
+        currency = self.fx.resolve(currency)
         
-        enriched_holdings = []
-        for holding_dict in holdings_data:
-            # The JSON already has calculated values, just create Holding objects
-            enriched_holding = Holding(
+        if self._store is not None:
+            # Amounts are converted inside the query
+            holdings_data = self._store.query_holdings(sector=sector, market_cap=market_cap, sort_by=sort_by,
+                                                      descending=descending, limit=limit, offset=offset,
+                                                      fx_factors=self._fx_factors(currency))
+            return [self._to_holding(holding_dict) for holding_dict in holdings_data]
+        
+        holdings_data = self._load_portfolio_data().get('holdings', [])
+        converted = self._converted_amounts(currency)
+        
+        # Filter, sort and page positions; records are only built for the returned page
+        positions = list(range(len(holdings_data)))
+        if sector:
+            positions = [i for i in positions if holdings_data[i]['sector'] == sector]
+        if market_cap:
+            positions = [i for i in positions if holdings_data[i]['marketCap'] == market_cap]
+        if sort_by in MONETARY_FIELDS:
+            keys = converted[positions, HoldingAmounts.column(sort_by)].tolist()
+            order = sorted(range(len(positions)), key=keys.__getitem__, reverse=descending)
+            positions = [positions[k] for k in order]
+        elif sort_by:
+            positions = sorted(positions, key=lambda i: holdings_data[i][sort_by], reverse=descending)
+        if limit is not None or offset:
+            positions = positions[offset:offset + limit if limit is not None else None]
+        
+        return [self._to_holding(self._converted_record(holdings_data[i], converted, i)) for i in positions]
+    
+    def _listing_currencies(self) -> List[str]:
+        """Listing currencies present in the current snapshot"""
+        if self._store is not None:
+            return self._cached('listing_currencies', self.fx.base, self._store.listing_currencies)
+        return list(self._get_holding_amounts().groups)
+    
+    def _fx_factors(self, currency: str) -> Dict[str, float]:
+        """Multipliers into the reporting currency for every listing currency in the book.
+        
+        Raises MissingFXRateError naming any listing currency without a rate,
+        the same way the JSON backend's conversion does.
+        """
+        return {c: self.fx.factor(c, currency) for c in self._listing_currencies()}
+    
+    def get_holding(self, symbol: str, currency: Optional[str] = None) -> Optional[Holding]:
+        """Get a single holding by symbol via the hash index (or primary key on SQLite)"""
+        currency = self.fx.resolve(currency)
+        if self._store is not None:
+            holding_dict = self._store.get_holding(symbol, fx_factors=self._fx_factors(currency))
+            return self._to_holding(holding_dict) if holding_dict is not None else None
+        
+        position = self._get_holdings_index().get_position(symbol)
+        if position is None:
+            return None
+        holdings_data = self._load_portfolio_data().get('holdings', [])
+        return self._to_holding(self._converted_record(holdings_data[position], self._converted_amounts(currency), position))
+    
+    def search_holdings(self, query: str, limit: int = 10, fuzzy: bool = False) -> List[SearchResult]:
+        """Type-ahead search over holding symbols and company names"""
+        index = self._get_holdings_index()
+        matches = index.search(query, limit=limit, fuzzy=fuzzy)
+        
+        results = []
+        for position, score in matches:
+            holding_dict = index.record(position)
+            results.append(SearchResult(
                 symbol=holding_dict['symbol'],
                 name=holding_dict['name'],
-                quantity=holding_dict['quantity'],
-                avgPrice=holding_dict['avgPrice'],
-                currentPrice=holding_dict['currentPrice'],
                 sector=holding_dict['sector'],
-                marketCap=holding_dict['marketCap'],
-                value=holding_dict.get('value', holding_dict['quantity'] * holding_dict['currentPrice']),
-                gainLoss=holding_dict.get('gainLoss', 0),
-                gainLossPercent=holding_dict.get('gainLossPercent', 0)
-            )
-            enriched_holdings.append(enriched_holding)
+                score=score
+            ))
         
-        return enriched_holdings
+        return results
     
-    def get_allocation(self) -> Allocation:
-        """Calculate portfolio allocation by sector and market cap"""
-        portfolio_data = self._load_portfolio_data()
+    def iter_holding_records(self) -> Iterator[Dict[str, Any]]:
+        """Flat holding records with computed values, yielded one at a time (for export)"""
+        # Totals and FX factors are resolved here rather than inside the
+        # generator, so failures raise before a streaming response starts.
+        # Values are exported in each holding's own currency; allocation is
+        # computed on base-currency values so mixed books add up to 100%
+        if self._store is not None:
+            by_currency = self._store.value_by_currency()
+            holdings_data = self._store.iter_holdings()
+        else:
+            holdings_data = self._load_portfolio_data().get('holdings', [])
+            values = self._get_holding_amounts().matrix[:, HoldingAmounts.column('value')]
+            by_currency = {c: float(values[rows].sum()) for c, rows in self._get_holding_amounts().groups.items()}
+        factors = {currency: self.fx.factor(currency, self.fx.base) for currency in by_currency}
+        total_value = sum(value * factors[currency] for currency, value in by_currency.items())
+        return self._holding_records(holdings_data, factors, total_value)
+    
+    def _holding_records(self, holdings_data: Iterable[Dict[str, Any]], factors: Dict[str, float],
+                         total_value: float) -> Iterator[Dict[str, Any]]:
+        for holding_dict in holdings_data:
+            value = holding_dict.get('value', holding_dict['quantity'] * holding_dict['currentPrice'])
+            invested = holding_dict.get('invested', holding_dict['quantity'] * holding_dict['avgPrice'])
+            currency = currency_for(holding_dict)
+            base_value = value * factors[currency]
+            yield {
+                'symbol': holding_dict['symbol'],
+                'name': holding_dict['name'],
+                'exchange': holding_dict.get('exchange', 'NSE'),
+                'currency': currency,
+                'sector': holding_dict['sector'],
+                'marketCap': holding_dict['marketCap'],
+                'quantity': holding_dict['quantity'],
+                'avgPrice': holding_dict['avgPrice'],
+                'currentPrice': holding_dict['currentPrice'],
+                'invested': round(invested, 2),
+                'value': round(value, 2),
+                'gainLoss': holding_dict.get('gainLoss', round(value - invested, 2)),
+                'gainLossPercent': holding_dict.get('gainLossPercent', 0),
+                'allocation': round((base_value / total_value) * 100, 2) if total_value > 0 else 0
+            }
+    
+    def iter_timeline_records(self) -> Iterator[Dict[str, Any]]:
+        """Performance timeline records, yielded one at a time (for export)"""
+        timeline = self._get_timeline_data()
+        return ({
+            'date': perf_point['date'],
+            'portfolio': float(perf_point['portfolio']),
+            'nifty50': float(perf_point['nifty50']),
+            'gold': float(perf_point['gold'])
+        } for perf_point in timeline)
+    
+    def _get_timeline_data(self) -> List[Dict[str, Any]]:
+        """Raw performance timeline from the active storage backend"""
+        if self._store is not None:
+            return self._store.get_timeline()
+        return self._load_portfolio_data().get('historical_performance', [])
+    
+    def _allocation_from_aggregates(self, column: str, currency: str) -> Dict[str, AllocationItem]:
+        """Allocation items from a SQL GROUP BY over holdings, converted per currency group"""
+        by_key = {}
+        # Groups arrive in order of first appearance, as the JSON backend builds them
+        for group in self._store.aggregate(column):
+            converted = group['value'] * self.fx.factor(group['currency'], currency)
+            totals = by_key.setdefault(group['key'], {"value": 0, "count": 0})
+            totals["value"] += converted
+            totals["count"] += group['count']
         
-        # Try to use pre-calculated allocation data from JSON
-        sector_data = portfolio_data.get('sector_allocation', [])
-        market_cap_data = portfolio_data.get('market_cap_allocation', [])
+        total_value = sum(data["value"] for data in by_key.values())
+        items = {}
+        for key, data in by_key.items():
+            percentage = round((data["value"] / total_value) * 100, 2) if total_value > 0 else 0
+            items[key] = AllocationItem(
+                value=round(data["value"], 2),
+                percentage=percentage,
+                count=data["count"]
+            )
+        return items
+    
+    def get_allocation(self, currency: Optional[str] = None) -> Allocation:
+        """Calculate portfolio allocation by sector and market cap"""
+        currency = self.fx.resolve(currency)
+        return self._cached('allocation', currency, lambda: self._compute_allocation(currency))
+    
+    def _compute_allocation(self, currency: str) -> Allocation:
+        if self._store is not None:
+            # Same pre-calculated sheets as the JSON backend, imported into SQLite
+            sector_data = self._store.get_allocation_sheet('sector')
+            market_cap_data = self._store.get_allocation_sheet('marketCap')
+            unconverted = all(self.fx.factor(c, currency) == 1.0 for c in self._store.value_by_currency())
+            if not (sector_data and market_cap_data and unconverted):
+                return Allocation(
+                    bySector=self._allocation_from_aggregates('sector', currency),
+                    byMarketCap=self._allocation_from_aggregates('marketCap', currency),
+                    currency=currency
+                )
+        else:
+            portfolio_data = self._load_portfolio_data()
+            
+            # Try to use pre-calculated allocation data from JSON
+            sector_data = portfolio_data.get('sector_allocation', [])
+            market_cap_data = portfolio_data.get('market_cap_allocation', [])
+            
+            # The pre-calculated sheets are in base currency, so they only apply
+            # when no holding needed converting into the reporting currency
+            unconverted = self._converted_amounts(currency) is self._get_holding_amounts().matrix
         
         # If pre-calculated data exists, use it
-        if sector_data and market_cap_data:
+        if sector_data and market_cap_data and unconverted:
             by_sector_items = {}
             for sector_item in sector_data:
                 by_sector_items[sector_item['sector']] = AllocationItem(
@@ -111,25 +363,27 @@ class PortfolioDataService:
                     count=cap_item.get('holdingsCount', 0)
                 )
         else:
-            # Calculate from holdings if pre-calculated data not available
-            holdings = self.get_holdings()
-            total_value = sum(h.value for h in holdings)
+            # Calculate from holdings if pre-calculated data not available,
+            # summing full-precision converted values
+            holdings = portfolio_data.get('holdings', [])
+            values = self._converted_amounts(currency)[:, HoldingAmounts.column('value')].tolist()
+            total_value = sum(values)
             
             # Calculate by sector
             by_sector = {}
-            for holding in holdings:
-                if holding.sector not in by_sector:
-                    by_sector[holding.sector] = {"value": 0, "count": 0}
-                by_sector[holding.sector]["value"] += holding.value
-                by_sector[holding.sector]["count"] += 1
+            for holding, value in zip(holdings, values):
+                if holding['sector'] not in by_sector:
+                    by_sector[holding['sector']] = {"value": 0, "count": 0}
+                by_sector[holding['sector']]["value"] += value
+                by_sector[holding['sector']]["count"] += 1
             
             # Calculate by market cap
             by_market_cap = {}
-            for holding in holdings:
-                if holding.marketCap not in by_market_cap:
-                    by_market_cap[holding.marketCap] = {"value": 0, "count": 0}
-                by_market_cap[holding.marketCap]["value"] += holding.value
-                by_market_cap[holding.marketCap]["count"] += 1
+            for holding, value in zip(holdings, values):
+                if holding['marketCap'] not in by_market_cap:
+                    by_market_cap[holding['marketCap']] = {"value": 0, "count": 0}
+                by_market_cap[holding['marketCap']]["value"] += value
+                by_market_cap[holding['marketCap']]["count"] += 1
             
             # Convert to allocation items with percentages
             by_sector_items = {}
@@ -152,23 +406,25 @@ class PortfolioDataService:
         
         return Allocation(
             bySector=by_sector_items,
-            byMarketCap=by_market_cap_items
+            byMarketCap=by_market_cap_items,
+            currency=currency
         )
     
-    def get_performance(self) -> Performance:
-        """Get performance data with timeline and returns"""
-        portfolio_data = self._load_portfolio_data()
-        performance_data = portfolio_data.get('historical_performance', [])
-        
-        # Create timeline from JSON data
+    def _get_timeline(self) -> List[TimelinePoint]:
+        """Performance timeline points from the active storage backend"""
         timeline = []
-        for perf_point in performance_data:
+        for perf_point in self._get_timeline_data():
             timeline.append(TimelinePoint(
                 date=perf_point['date'],
                 portfolio=float(perf_point['portfolio']),
                 nifty50=float(perf_point['nifty50']),
                 gold=float(perf_point['gold'])
             ))
+        return timeline
+    
+    def get_performance(self) -> Performance:
+        """Get performance data with timeline and returns"""
+        timeline = self._get_timeline()
         
         def calculate_returns(series: List[float]) -> Returns:
             if len(series) < 2:
@@ -197,22 +453,50 @@ class PortfolioDataService:
         
         return Performance(timeline=timeline, returns=returns)
     
-    def get_summary(self) -> Summary:
+    def get_summary(self, currency: Optional[str] = None) -> Summary:
         """Get portfolio summary with key metrics"""
-        holdings = self.get_holdings()
+        currency = self.fx.resolve(currency)
+        return self._cached('summary', currency, lambda: self._compute_summary(currency))
+    
+    def _compute_summary(self, currency: str) -> Summary:
+        if self._store is not None:
+            # Totals and extremes come straight from SQL aggregates
+            stats = self._store.summary_stats()
+            if stats['top'] is None:
+                raise RuntimeError("Portfolio has no holdings")
+            total_invested = sum(row['total_invested'] * self.fx.factor(row['currency'], currency)
+                                 for row in stats['by_currency'])
+            total_value = sum(row['total_value'] * self.fx.factor(row['currency'], currency)
+                              for row in stats['by_currency'])
+            holdings_count = stats['count']
+            unique_sectors = stats['sectors']
+            top_performer = TopPerformer(symbol=stats['top']['symbol'], name=stats['top']['name'],
+                                         gainPercent=stats['top']['gainLossPercent'])
+            worst_performer = TopPerformer(symbol=stats['worst']['symbol'], name=stats['worst']['name'],
+                                           gainPercent=stats['worst']['gainLossPercent'])
+        else:
+            holdings = self._load_portfolio_data().get('holdings', [])
+            
+            # Totals use the full-precision converted amounts, as SQL does
+            amounts = self._get_holding_amounts()
+            converted = self._converted_amounts(currency)
+            total_invested = float((amounts.quantity * converted[:, HoldingAmounts.column('avgPrice')]).sum())
+            total_value = float(converted[:, HoldingAmounts.column('value')].sum())
+            holdings_count = len(holdings)
+            
+            # Find top and worst performers
+            sorted_holdings = sorted(holdings, key=lambda h: h.get('gainLossPercent', 0), reverse=True)
+            top_performer = TopPerformer(symbol=sorted_holdings[0]['symbol'], name=sorted_holdings[0]['name'],
+                                         gainPercent=sorted_holdings[0].get('gainLossPercent', 0))
+            worst_performer = TopPerformer(symbol=sorted_holdings[-1]['symbol'], name=sorted_holdings[-1]['name'],
+                                           gainPercent=sorted_holdings[-1].get('gainLossPercent', 0))
+            
+            unique_sectors = len(set(h['sector'] for h in holdings))
         
-        total_invested = sum(h.quantity * h.avgPrice for h in holdings)
-        total_value = sum(h.value for h in holdings)
         total_gain_loss = total_value - total_invested
         total_gain_loss_percent = round((total_gain_loss / total_invested) * 100, 2) if total_invested > 0 else 0
         
-        # Find top and worst performers
-        sorted_holdings = sorted(holdings, key=lambda h: h.gainLossPercent, reverse=True)
-        top_performer = sorted_holdings[0]
-        worst_performer = sorted_holdings[-1]
-        
         # Calculate diversification score
-        unique_sectors = len(set(h.sector for h in holdings))
         diversification_score = min(10.0, round((unique_sectors / 8) * 10, 1))
         
         # Determine risk level
@@ -223,25 +507,72 @@ class PortfolioDataService:
             totalInvested=round(total_invested, 2),
             totalGainLoss=round(total_gain_loss, 2),
             totalGainLossPercent=total_gain_loss_percent,
-            holdingsCount=len(holdings),
-            topPerformer=TopPerformer(
-                symbol=top_performer.symbol,
-                name=top_performer.name,
-                gainPercent=top_performer.gainLossPercent
-            ),
-            worstPerformer=TopPerformer(
-                symbol=worst_performer.symbol,
-                name=worst_performer.name,
-                gainPercent=worst_performer.gainLossPercent
-            ),
+            holdingsCount=holdings_count,
+            topPerformer=top_performer,
+            worstPerformer=worst_performer,
             diversificationScore=diversification_score,
-            riskLevel=risk_level
+            riskLevel=risk_level,
+            currency=currency
+        )
+    
+    def get_version(self) -> int:
+        """Version of the current snapshot; a new version is recorded whenever the data is reloaded"""
+        # Deltas are expressed in the base currency, so FX changes never alter
+        # them and do not need a new fingerprint of the book
+        if self._versioned_key != self._snapshot_id:
+            with self._version_lock:
+                snapshot_id = self._snapshot_id
+                if self._versioned_key != snapshot_id:
+                    holdings = [h.model_dump() for h in self.get_holdings()]
+                    timeline = [t.model_dump() for t in self._get_timeline()]
+                    self._changes.record(holdings, timeline)
+                    self._versioned_key = snapshot_id
+        return self._changes.version
+    
+    def get_holdings_delta(self, since: int) -> HoldingsDelta:
+        """Holdings added, changed and removed since a client's version"""
+        version = self.get_version()
+        delta = self._changes.holdings_since(since)
+        if delta is None:
+            return HoldingsDelta(version=version, since=since, fullResync=True)
+        return HoldingsDelta(version=version, since=since, **delta)
+    
+    def get_performance_delta(self, since: int) -> PerformanceDelta:
+        """Timeline points added or updated since a client's version"""
+        version = self.get_version()
+        delta = self._changes.timeline_since(since)
+        if delta is None:
+            return PerformanceDelta(version=version, since=since, fullResync=True)
+        if not delta['upserted'] and not delta['removed']:
+            return PerformanceDelta(version=version, since=since)
+        return PerformanceDelta(
+            version=version,
+            since=since,
+            timeline=delta['upserted'],
+            removedDates=delta['removed'],
+            returns=self.get_performance().returns
         )
     
     def reload_data(self) -> None:
-        """Force reload data from JSON file (useful after data import)"""
+        """Force reload data from storage (useful after data import)"""
         self._portfolio_data = None
+        self._holdings_index = None
+        self._holding_amounts = None
+        self._snapshot_id += 1
+        if self._store is not None:
+            self._store.close()
+        self.fx.load()
         print("🔄 Portfolio data cache cleared, will reload on next request")
+    
+    def get_fx_rates(self) -> FXRates:
+        """Current FX rate table"""
+        return FXRates(base=self.fx.base, rates=dict(self.fx.rates),
+                       version=self.fx.version, updatedAt=self.fx.updated_at)
+    
+    def update_fx_rates(self, rates: Dict[str, float]) -> FXRates:
+        """Merge pushed FX rates; cached conversions are invalidated by the version bump"""
+        self.fx.update(rates)
+        return self.get_fx_rates()
 
 # Create a singleton instance
 portfolio_service = PortfolioDataService()
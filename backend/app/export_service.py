@@ -0,0 +1,128 @@
+"""
+Portfolio Export
+Streams holdings and performance data as CSV or XLSX without building
+the whole file in memory.
+"""
+
+import csv
+import io
+import tempfile
+from typing import IO, Dict, List, Iterator, Any
+
+from openpyxl import Workbook
+
+from .data_service import PortfolioDataService, portfolio_service
+
+# Column order per section; keys match the records yielded by the data service
+EXPORT_COLUMNS: Dict[str, List[str]] = {
+    'holdings': [
+        'symbol', 'name', 'exchange', 'currency', 'sector', 'marketCap', 'quantity', 'avgPrice',
+        'currentPrice', 'invested', 'value', 'gainLoss', 'gainLossPercent', 'allocation'
+    ],
+    'performance': ['date', 'portfolio', 'nifty50', 'gold'],
+}
+EXPORT_FORMATS = ('csv', 'xlsx')
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+CSV_FLUSH_ROWS = 500
+XLSX_CHUNK_SIZE = 64 * 1024
+XLSX_SPOOL_SIZE = 8 * 1024 * 1024
+
+class PortfolioExporter:
+    def __init__(self, data_service: PortfolioDataService):
+        self.data_service = data_service
+
+    def parse_sections(self, sections: str) -> List[str]:
+        """Parse a comma-separated section list, raising ValueError on unknown names"""
+        requested = [s.strip().lower() for s in sections.split(',') if s.strip()]
+        if not requested:
+            raise ValueError("At least one export section is required")
+        unknown = [s for s in requested if s not in EXPORT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown export sections: {', '.join(unknown)} "
+                             f"(expected any of: {', '.join(EXPORT_COLUMNS)})")
+        # Keep request order but drop duplicates
+        return list(dict.fromkeys(requested))
+
+    def _iter_records(self, section: str) -> Iterator[Dict[str, Any]]:
+        if section == 'holdings':
+            return self.data_service.iter_holding_records()
+        return self.data_service.iter_timeline_records()
+
+    def iter_csv(self, sections: List[str], records: Dict[str, Iterator[Dict[str, Any]]]) -> Iterator[bytes]:
+        """Yield CSV bytes; multiple sections are separated by a blank line and a title row"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+
+        for i, section in enumerate(sections):
+            columns = EXPORT_COLUMNS[section]
+            if len(sections) > 1:
+                if i > 0:
+                    writer.writerow([])
+                writer.writerow([f"# {section}"])
+            writer.writerow(columns)
+
+            for record in records[section]:
+                writer.writerow([record[column] for column in columns])
+                pending += 1
+                # Batch rows into modest chunks rather than one tiny write per row
+                if pending >= CSV_FLUSH_ROWS:
+                    yield buffer.getvalue().encode('utf-8')
+                    buffer.seek(0)
+                    buffer.truncate(0)
+                    pending = 0
+
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def build_xlsx(self, sections: List[str], records: Dict[str, Iterator[Dict[str, Any]]]) -> IO[bytes]:
+        """Build an XLSX workbook with openpyxl's write-only mode, one sheet per section, into a spooled file"""
+        # Write-only sheets stream rows to disk as they are appended; the zip
+        # container itself can only be produced at save time, so it is spooled
+        # to a temp file and then streamed out in chunks
+        workbook = Workbook(write_only=True)
+        for section in sections:
+            columns = EXPORT_COLUMNS[section]
+            sheet = workbook.create_sheet(title=section.capitalize())
+            sheet.append(columns)
+            for record in records[section]:
+                sheet.append([record[column] for column in columns])
+
+        spool = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_SIZE)
+        try:
+            workbook.save(spool)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    def iter_file(self, spool: IO[bytes]) -> Iterator[bytes]:
+        """Yield a file in chunks, closing it when done"""
+        with spool:
+            while True:
+                chunk = spool.read(XLSX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def export(self, fmt: str, sections: List[str]) -> Iterator[bytes]:
+        """Return a byte iterator for the requested format.
+
+        Records are opened (and an XLSX workbook is fully built) before this
+        returns, so data and FX errors raise here instead of truncating a
+        response that has already started.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt} (expected one of: {', '.join(EXPORT_FORMATS)})")
+        records = {section: self._iter_records(section) for section in sections}
+        if fmt == 'csv':
+            return self.iter_csv(sections, records)
+        return self.iter_file(self.build_xlsx(sections, records))
+
+# Create a singleton instance
+portfolio_exporter = PortfolioExporter(portfolio_service)
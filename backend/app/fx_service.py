@@ -0,0 +1,182 @@
+"""
+FX Rates
+Currency rate table and conversion of holding values into a reporting
+currency. Conversion is vectorised: one numpy multiply per currency group.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+BASE_CURRENCY = 'INR'
+
+# Listing currency assumed for holdings whose source data has no currency
+EXCHANGE_CURRENCIES = {
+    'NSE': 'INR',
+    'BSE': 'INR',
+    'NYSE': 'USD',
+    'NASDAQ': 'USD',
+    'LSE': 'GBP',
+    'XETRA': 'EUR',
+    'EURONEXT': 'EUR',
+    'TSE': 'JPY',
+    'HKEX': 'HKD',
+    'SGX': 'SGD',
+}
+
+# Holding fields expressed in the holding's currency
+MONETARY_FIELDS = ['avgPrice', 'currentPrice', 'value', 'invested', 'gainLoss']
+
+def currency_for(holding: Dict[str, Any]) -> str:
+    """Listing currency of a holding record, inferred from its exchange if not set"""
+    currency = holding.get('currency')
+    if currency:
+        return str(currency).strip().upper()
+    return EXCHANGE_CURRENCIES.get(str(holding.get('exchange', 'NSE')).strip().upper(), BASE_CURRENCY)
+
+class MissingFXRateError(RuntimeError):
+    """A holding's listing currency has no rate: a server data problem, not a bad request"""
+
+class FXRateTable:
+    def __init__(self, rates_file: str, overrides_file: Optional[str] = None):
+        # Shipped default rates, plus pushed rates persisted separately so the
+        # defaults file is never rewritten
+        self.rates_file = rates_file
+        self.overrides_file = overrides_file
+        self.base = BASE_CURRENCY
+        # Units of base currency per one unit of each currency
+        self.rates: Dict[str, float] = {BASE_CURRENCY: 1.0}
+        self.updated_at: Optional[str] = None
+        # Bumped whenever the rates change; part of converted-value cache keys
+        self.version = 0
+        self._overrides: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _read(self, path: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Read and validate one rates file; None if it does not exist"""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        base = str(data.get('base', BASE_CURRENCY)).upper()
+        if base != BASE_CURRENCY:
+            raise ValueError(f"base {base} is not {BASE_CURRENCY}")
+        return {'rates': self._validate(data.get('rates', {})), 'updated_at': data.get('updated_at')}
+
+    def load(self) -> None:
+        """Load default and pushed rates; the version only changes if the rates did"""
+        # A broken file leaves the current table in place rather than failing startup or reload
+        try:
+            defaults = self._read(self.rates_file)
+            overrides = self._read(self.overrides_file)
+        except Exception as e:
+            print(f"Error loading FX rates, keeping current table: {e}")
+            return
+
+        override_rates = overrides['rates'] if overrides else {}
+        rates = {**(defaults['rates'] if defaults else {}), **override_rates, BASE_CURRENCY: 1.0}
+        updated_at = (overrides or defaults or {}).get('updated_at')
+
+        with self._lock:
+            self._overrides = override_rates
+            if rates != self.rates:
+                self.rates = rates
+                self.updated_at = updated_at
+                self.version += 1
+                print(f"💱 Loaded {len(rates)} FX rates (version {self.version})")
+
+    def update(self, rates: Dict[str, float]) -> None:
+        """Merge pushed rates into the table and persist them to the overrides file"""
+        rates = self._validate(rates)
+        if BASE_CURRENCY in rates and rates[BASE_CURRENCY] != 1.0:
+            raise ValueError(f"Rate for base currency {BASE_CURRENCY} must be 1")
+
+        with self._lock:
+            merged = {**self.rates, **rates}
+            if merged == self.rates:
+                return
+            updated_at = datetime.now().isoformat()
+            overrides = {**self._overrides, **rates}
+            if self.overrides_file:
+                # Persist under the lock via a temp file and an atomic rename,
+                # so concurrent pushes and reloads never see a partial or stale file
+                tmp_file = f"{self.overrides_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'base': self.base, 'updated_at': updated_at, 'rates': overrides}, f, indent=2)
+                os.replace(tmp_file, self.overrides_file)
+            self._overrides = overrides
+            self.rates = merged
+            self.updated_at = updated_at
+            self.version += 1
+
+    @staticmethod
+    def _validate(rates: Dict[str, Any]) -> Dict[str, float]:
+        validated = {}
+        for currency, rate in rates.items():
+            rate = float(rate)
+            if not rate > 0:
+                raise ValueError(f"FX rate for {currency} must be positive")
+            validated[str(currency).strip().upper()] = rate
+        return validated
+
+    def resolve(self, currency: Optional[str]) -> str:
+        """Normalise a requested reporting currency, defaulting to the base"""
+        currency = (currency or self.base).strip().upper()
+        if currency not in self.rates:
+            raise ValueError(f"No FX rate for currency: {currency}")
+        return currency
+
+    def factor(self, from_currency: str, to_currency: str) -> float:
+        """Multiplier converting an amount in from_currency into to_currency"""
+        if from_currency == to_currency:
+            return 1.0
+        rates = self.rates
+        if to_currency not in rates:
+            raise ValueError(f"No FX rate for currency: {to_currency}")
+        if from_currency not in rates:
+            raise MissingFXRateError(f"No FX rate for listing currency: {from_currency}")
+        return rates[from_currency] / rates[to_currency]
+
+    def convert_totals(self, totals: Dict[str, float], to_currency: str) -> float:
+        """Sum per-currency totals in the target currency"""
+        return sum(amount * self.factor(currency, to_currency) for currency, amount in totals.items())
+
+    def convert_amounts(self, amounts: 'HoldingAmounts', to_currency: str) -> np.ndarray:
+        """Monetary matrix in the target currency at full precision (returns amounts.matrix if nothing needs converting)"""
+        factors = {currency: self.factor(currency, to_currency) for currency in amounts.groups}
+        if all(f == 1.0 for f in factors.values()):
+            return amounts.matrix
+
+        converted = amounts.matrix.copy()
+        for currency, rows in amounts.groups.items():
+            if factors[currency] != 1.0:
+                converted[rows] *= factors[currency]
+        return converted
+
+class HoldingAmounts:
+    """Monetary fields of a holdings list as numpy columns in each listing currency.
+
+    Built once per snapshot; converting is then one multiply per currency group.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.quantity = np.array([record['quantity'] for record in records], dtype=np.float64)
+        self.matrix = np.empty((len(records), len(MONETARY_FIELDS)), dtype=np.float64)
+        groups: Dict[str, List[int]] = {}
+        for i, record in enumerate(records):
+            # Derived amounts are rounded as the import stores them in SQLite
+            value = record.get('value', round(record['quantity'] * record['currentPrice'], 2))
+            invested = record.get('invested', round(record['quantity'] * record['avgPrice'], 2))
+            self.matrix[i] = (record['avgPrice'], record['currentPrice'], value, invested,
+                              record.get('gainLoss', round(value - invested, 2)))
+            groups.setdefault(currency_for(record), []).append(i)
+        self.groups = {currency: np.asarray(rows, dtype=np.intp) for currency, rows in groups.items()}
+
+    @staticmethod
+    def column(field: str) -> int:
+        return MONETARY_FIELDS.index(field)
@@ -1,11 +1,14 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+from datetime import datetime
 import uvicorn
 import os
 
-from .models import Holding, Allocation, Performance, Summary
+from .models import Holding, Allocation, Performance, Summary, SearchResult, FXRates, FXRatesUpdate, HoldingsDelta, PerformanceDelta
 from .data_service import portfolio_service
+from .export_service import portfolio_exporter, EXPORT_MEDIA_TYPES
 
 # Create FastAPI app
 app = FastAPI(
@@ -24,6 +27,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Portfolio-Version", "X-Reporting-Currency"],
 )
 
 @app.get("/")
@@ -31,40 +35,139 @@ async def root():
     """Health check endpoint"""
     return {"message": "Portfolio Analytics API is running"}
 
-@app.get("/api/portfolio/holdings", response_model=List[Holding])
-async def get_holdings():
-    """Get complete list of user's stock investments"""
+# Data endpoints are plain def so FastAPI runs them in its threadpool; the
+# SQLite backend blocks on queries and pooled connections
+@app.get("/api/portfolio/holdings", response_model=Union[List[Holding], HoldingsDelta])
+def get_holdings(
+    response: Response,
+    sector: Optional[str] = None,
+    marketCap: Optional[str] = None,
+    sortBy: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    currency: Optional[str] = None,
+    since: Optional[int] = Query(None, description="Return only changes since this snapshot version")
+):
+    """Get user's stock investments, optionally filtered, sorted and paginated"""
     try:
-        return portfolio_service.get_holdings()
+        response.headers["X-Portfolio-Version"] = str(portfolio_service.get_version())
+        # Amounts are in this currency; each holding carries its own listingCurrency
+        response.headers["X-Reporting-Currency"] = portfolio_service.fx.resolve(currency)
+        if since is not None:
+            if any(p is not None for p in (sector, marketCap, sortBy, limit, currency)) or offset:
+                raise ValueError("since cannot be combined with filters, sorting, pagination or currency")
+            return portfolio_service.get_holdings_delta(since)
+        return portfolio_service.get_holdings(
+            sector=sector, market_cap=marketCap, sort_by=sortBy,
+            descending=order == "desc", limit=limit, offset=offset, currency=currency
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute holdings: {str(e)}")
 
+@app.get("/api/portfolio/holdings/{symbol}", response_model=Holding)
+def get_holding(response: Response, symbol: str, currency: Optional[str] = None):
+    """Get a single holding by its symbol"""
+    try:
+        response.headers["X-Reporting-Currency"] = portfolio_service.fx.resolve(currency)
+        holding = portfolio_service.get_holding(symbol, currency=currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to look up holding: {str(e)}")
+    if holding is None:
+        raise HTTPException(status_code=404, detail=f"Holding not found: {symbol}")
+    return holding
+
+@app.get("/api/portfolio/search", response_model=List[SearchResult])
+def search_holdings(
+    q: str = Query(..., min_length=1, description="Symbol or company name prefix"),
+    limit: int = Query(10, ge=1, le=50),
+    fuzzy: bool = Query(False, description="Also rank near matches for typos")
+):
+    """Type-ahead search over holding symbols and company names"""
+    try:
+        return portfolio_service.search_holdings(q, limit=limit, fuzzy=fuzzy)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search holdings: {str(e)}")
+
 @app.get("/api/portfolio/allocation", response_model=Allocation)
-async def get_allocation():
+def get_allocation(currency: Optional[str] = None):
     """Get asset distribution by sectors and market cap"""
     try:
-        return portfolio_service.get_allocation()
+        return portfolio_service.get_allocation(currency=currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute allocation: {str(e)}")
 
-@app.get("/api/portfolio/performance", response_model=Performance)
-async def get_performance():
+@app.get("/api/portfolio/performance", response_model=Union[Performance, PerformanceDelta])
+def get_performance(
+    response: Response,
+    since: Optional[int] = Query(None, description="Return only timeline changes since this snapshot version")
+):
     """Get historical performance vs benchmarks"""
     try:
+        response.headers["X-Portfolio-Version"] = str(portfolio_service.get_version())
+        if since is not None:
+            return portfolio_service.get_performance_delta(since)
         return portfolio_service.get_performance()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute performance: {str(e)}")
 
 @app.get("/api/portfolio/summary", response_model=Summary)
-async def get_summary():
+def get_summary(currency: Optional[str] = None):
     """Get key portfolio metrics and insights"""
     try:
-        return portfolio_service.get_summary()
+        return portfolio_service.get_summary(currency=currency)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to compute summary: {str(e)}")
 
+@app.get("/api/portfolio/fx-rates", response_model=FXRates)
+def get_fx_rates():
+    """Get the FX rates used for reporting-currency conversion"""
+    return portfolio_service.get_fx_rates()
+
+@app.put("/api/portfolio/fx-rates", response_model=FXRates)
+def update_fx_rates(update: FXRatesUpdate):
+    """Push new FX rates (merged into the current table)"""
+    try:
+        return portfolio_service.update_fx_rates(update.rates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update FX rates: {str(e)}")
+
+@app.get("/api/portfolio/export")
+def export_portfolio(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    sections: str = Query("holdings,performance", description="Comma-separated: holdings, performance")
+):
+    """Stream holdings and performance as a CSV or XLSX download"""
+    try:
+        section_list = portfolio_exporter.parse_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Resolve data and FX errors before the response starts streaming
+    try:
+        body = portfolio_exporter.export(fmt, section_list)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export portfolio: {str(e)}")
+    
+    filename = f"portfolio_{'_'.join(section_list)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.post("/api/portfolio/reload")
-async def reload_data():
+def reload_data():
     """Reload portfolio data from JSON file (useful after data import)"""
     try:
         portfolio_service.reload_data()
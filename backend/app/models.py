@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict, List, Literal
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 class Holding(BaseModel):
@@ -10,10 +10,17 @@ class Holding(BaseModel):
     currentPrice: float
     sector: str
     marketCap: Literal["Large", "Mid", "Small"]
+    listingCurrency: str = "INR"  # Amounts are in the reporting currency (X-Reporting-Currency header)
     value: float
     gainLoss: float
     gainLossPercent: float
 
+class SearchResult(BaseModel):
+    symbol: str
+    name: str
+    sector: str
+    score: float
+
 class AllocationItem(BaseModel):
     value: float
     percentage: float
@@ -22,6 +29,7 @@ class AllocationItem(BaseModel):
 class Allocation(BaseModel):
     bySector: Dict[str, AllocationItem]
     byMarketCap: Dict[str, AllocationItem]
+    currency: str = "INR"
 
 class TimelinePoint(BaseModel):
     date: str
@@ -62,3 +70,29 @@ class Summary(BaseModel):
     worstPerformer: TopPerformer
     diversificationScore: float
     riskLevel: str
+    currency: str = "INR"
+
+class HoldingsDelta(BaseModel):
+    version: int
+    since: int
+    fullResync: bool = False  # Client is too far behind; refetch without `since`
+    added: List[Holding] = []
+    changed: List[Holding] = []
+    removed: List[str] = []
+
+class PerformanceDelta(BaseModel):
+    version: int
+    since: int
+    fullResync: bool = False
+    timeline: List[TimelinePoint] = []  # New or updated points
+    removedDates: List[str] = []
+    returns: Dict[str, Returns] = {}  # Only sent when the timeline changed
+
+class FXRates(BaseModel):
+    base: str
+    rates: Dict[str, float]  # Units of base currency per one unit of each currency
+    version: int
+    updatedAt: Optional[str] = None
+
+class FXRatesUpdate(BaseModel):
+    rates: Dict[str, float]
@@ -0,0 +1,200 @@
+"""
+Holdings Lookup Index
+Symbol hash index and prefix/fuzzy search over symbol and company name.
+Built once per portfolio snapshot and reused until the data is reloaded.
+"""
+
+from array import array
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, List, Iterable, Optional, Tuple
+
+# Score bands keep exact symbol hits above prefix hits above fuzzy hits
+EXACT_SCORE = 3.0
+SYMBOL_PREFIX_SCORE = 2.0
+NAME_PREFIX_SCORE = 1.0
+
+class PackedStrings:
+    """Strings stored as one packed str plus an offsets array.
+
+    Avoids a Python object per item; items are sliced out on access, which
+    is all bisect needs when the strings are sorted.
+    """
+
+    def __init__(self, strings: List[str]):
+        self._data = ''.join(strings)
+        self._offsets = array('I', [0])
+        total = 0
+        for s in strings:
+            total += len(s)
+            self._offsets.append(total)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._data[self._offsets[i]:self._offsets[i + 1]]
+
+class HoldingsIndex:
+    def __init__(self, rows: Iterable[Tuple[str, str, str]], max_fuzzy_candidates: int = 500):
+        """Build from (symbol, name, sector) rows in holdings list order"""
+        self.max_fuzzy_candidates = max_fuzzy_candidates
+
+        # Hash index: upper-cased symbol -> position in the holdings list.
+        # Symbols that are already upper case are reused rather than copied.
+        self._by_symbol: Dict[str, int] = {}
+        symbol_entries: List[Tuple[str, int]] = []
+        token_positions: Dict[str, List[int]] = {}
+        symbols: List[str] = []
+        names: List[str] = []
+        # Sectors are few, so each row stores a small code
+        sector_codes: Dict[str, int] = {}
+        self._sectors = array('H')
+        for position, (symbol, name, sector) in enumerate(rows):
+            symbol = str(symbol).strip()
+            name = str(name or '')
+            upper = symbol.upper()
+            self._by_symbol.setdefault(symbol if upper == symbol else upper, position)
+            symbol_entries.append((symbol.lower(), position))
+            symbols.append(symbol)
+            names.append(name)
+            self._sectors.append(sector_codes.setdefault(str(sector or ''), len(sector_codes)))
+
+            # One entry per distinct name token; common words such as
+            # "limited" are stored once and point at many positions
+            for token in set(name.lower().split()):
+                token_positions.setdefault(token, []).append(position)
+
+        # Display fields by position, packed so they cost no object per row;
+        # names are also read back to verify multi-word queries
+        self._symbol_by_position = PackedStrings(symbols)
+        self._names = PackedStrings(names)
+        self._sector_names = list(sector_codes)
+        del symbols, names
+
+        symbol_entries.sort()
+        self._symbols = PackedStrings([key for key, _ in symbol_entries])
+        self._symbol_positions = array('I', (position for _, position in symbol_entries))
+        del symbol_entries
+
+        # Name tokens in CSR layout: token i owns postings[offsets[i]:offsets[i + 1]]
+        tokens = sorted(token_positions)
+        self._tokens = PackedStrings(tokens)
+        self._postings = array('I')
+        self._posting_offsets = array('I', [0])
+        for token in tokens:
+            self._postings.extend(token_positions.pop(token))
+            self._posting_offsets.append(len(self._postings))
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
+
+    def record(self, position: int) -> Dict[str, str]:
+        """Symbol, name and sector of the holding at a position"""
+        return {
+            'symbol': self._symbol_by_position[position],
+            'name': self._names[position],
+            'sector': self._sector_names[self._sectors[position]],
+        }
+
+    def get_position(self, symbol: str) -> Optional[int]:
+        """Return the holdings list position for a symbol (case-insensitive)"""
+        return self._by_symbol.get(symbol.strip().upper())
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = False) -> List[Tuple[int, float]]:
+        """Return (position, score) pairs ranked best first"""
+        query = ' '.join(query.strip().lower().split())
+        if not query or limit <= 0:
+            return []
+
+        scores: Dict[int, float] = {}
+        # Look a little past the limit so symbol hits can outrank names
+        wanted = limit * 5
+
+        exact = self._by_symbol.get(query.upper())
+        if exact is not None:
+            scores[exact] = EXACT_SCORE
+
+        # Symbol prefix matches form one contiguous run in the sorted keys
+        start = bisect_left(self._symbols, query)
+        for i in range(start, min(start + wanted, len(self._symbols))):
+            key = self._symbols[i]
+            if not key.startswith(query):
+                break
+            position = self._symbol_positions[i]
+            # Shorter keys are closer to what was typed
+            score = SYMBOL_PREFIX_SCORE + len(query) / len(key) * 0.5
+            if score > scores.get(position, 0):
+                scores[position] = score
+
+        self._search_names(query, scores, wanted)
+
+        if fuzzy and len(scores) < limit:
+            self._fuzzy_search(query, scores, limit)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(position, round(score, 4)) for position, score in ranked[:limit]]
+
+    def _search_names(self, query: str, scores: Dict[int, float], wanted: int) -> None:
+        """Match the query against name text starting at any word boundary"""
+        first_word = query.split(' ', 1)[0]
+        # Candidates come from tokens prefixed by the first query word; the
+        # full query is then checked against the name. Scanning is capped so
+        # rare multi-word combinations cannot walk a huge postings list.
+        budget = wanted * 20
+        found = 0
+        start = bisect_left(self._tokens, first_word)
+        for t in range(start, len(self._tokens)):
+            if not self._tokens[t].startswith(first_word):
+                break
+            for p in range(self._posting_offsets[t], self._posting_offsets[t + 1]):
+                budget -= 1
+                position = self._postings[p]
+                name = ' ' + ' '.join(self._names[position].lower().split())
+                at = name.find(' ' + query)
+                if at >= 0:
+                    # Shorter remaining name is closer to what was typed
+                    score = NAME_PREFIX_SCORE + len(query) / (len(name) - at - 1) * 0.5
+                    if score > scores.get(position, 0):
+                        if position not in scores:
+                            found += 1
+                        scores[position] = score
+                if found >= wanted or budget <= 0:
+                    return
+
+    def _fuzzy_search(self, query: str, scores: Dict[int, float], limit: int) -> None:
+        """Score symbols and name tokens near the query in sort order, capped per call"""
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(query)
+        threshold = 0.6
+        fuzzy_scores: Dict[int, float] = {}
+
+        def scan(keys: PackedStrings, positions_of) -> None:
+            # Typos rarely hit the first character, so candidates come from
+            # that character's slice of the sorted keys, windowed around where
+            # the query would sort to bound the work done per keystroke
+            lo = bisect_left(keys, query[0])
+            hi = bisect_left(keys, chr(ord(query[0]) + 1), lo)
+            anchor = bisect_left(keys, query, lo, hi)
+            half = self.max_fuzzy_candidates // 2
+            start = max(lo, anchor - half // 2)
+            for i in range(start, min(hi, start + half)):
+                # Compare against a key prefix of similar length to the query
+                matcher.set_seq1(keys[i][:len(query) + 2])
+                if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                    continue
+                ratio = matcher.ratio()
+                if ratio < threshold:
+                    continue
+                for position in positions_of(i):
+                    if position not in scores and ratio > fuzzy_scores.get(position, 0):
+                        fuzzy_scores[position] = ratio
+
+        scan(self._symbols, lambda i: (self._symbol_positions[i],))
+        # Only the first few holdings of a common token are worth ranking
+        scan(self._tokens, lambda i: self._postings[self._posting_offsets[i]:
+                                                    min(self._posting_offsets[i + 1], self._posting_offsets[i] + limit)])
+
+        best = sorted(fuzzy_scores.items(), key=lambda item: (-item[1], item[0]))
+        for position, ratio in best[:limit - len(scores)]:
+            scores[position] = ratio * NAME_PREFIX_SCORE
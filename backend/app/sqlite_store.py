@@ -0,0 +1,416 @@
+"""
+SQLite Portfolio Store
+Optional indexed storage backend for large books. Filters, sorting,
+pagination and allocation aggregates run in SQL instead of Python, and
+imports upsert only the rows that changed.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from .fx_service import currency_for, BASE_CURRENCY, MONETARY_FIELDS
+
+HOLDING_COLUMNS = [
+    'symbol', 'name', 'quantity', 'avgPrice', 'currentPrice', 'sector', 'marketCap',
+    'exchange', 'currency', 'value', 'invested', 'gainLoss', 'gainLossPercent'
+]
+TIMELINE_COLUMNS = ['date', 'portfolio', 'nifty50', 'gold', 'portfolioReturn', 'niftyReturn', 'goldReturn']
+
+# Columns clients may sort holdings by; anything else is rejected before it reaches SQL
+SORTABLE_COLUMNS = {
+    'symbol', 'name', 'quantity', 'avgPrice', 'currentPrice', 'sector', 'marketCap',
+    'value', 'gainLoss', 'gainLossPercent'
+}
+# Sort columns holding amounts in the listing currency; sorting them across
+# currencies needs the FX factors applied inside ORDER BY
+MONETARY_COLUMNS = {'avgPrice', 'currentPrice', 'value', 'gainLoss'}
+# GROUP BY targets for allocation aggregates
+AGGREGATE_COLUMNS = {'sector', 'marketCap'}
+# Pre-calculated allocation sheets imported alongside the holdings: column -> (table, source key)
+ALLOCATION_TABLES = {
+    'sector': ('sector_allocation', 'sector_allocation'),
+    'marketCap': ('market_cap_allocation', 'market_cap_allocation'),
+}
+ALLOCATION_COLUMNS = ['value', 'percentage', 'holdingsCount', 'position']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    symbol TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    avgPrice REAL NOT NULL,
+    currentPrice REAL NOT NULL,
+    sector TEXT NOT NULL,
+    marketCap TEXT NOT NULL,
+    exchange TEXT NOT NULL DEFAULT 'NSE',
+    currency TEXT NOT NULL DEFAULT 'INR',
+    value REAL NOT NULL,
+    invested REAL NOT NULL,
+    gainLoss REAL NOT NULL,
+    gainLossPercent REAL NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_holdings_sector ON holdings(sector);
+CREATE INDEX IF NOT EXISTS idx_holdings_market_cap ON holdings(marketCap);
+CREATE INDEX IF NOT EXISTS idx_holdings_position ON holdings(position);
+CREATE TABLE IF NOT EXISTS timeline (
+    date TEXT PRIMARY KEY,
+    portfolio REAL NOT NULL,
+    nifty50 REAL NOT NULL,
+    gold REAL NOT NULL,
+    portfolioReturn REAL,
+    niftyReturn REAL,
+    goldReturn REAL
+);
+CREATE TABLE IF NOT EXISTS sector_allocation (
+    sector TEXT PRIMARY KEY,
+    value REAL NOT NULL,
+    percentage REAL NOT NULL,
+    holdingsCount INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS market_cap_allocation (
+    marketCap TEXT PRIMARY KEY,
+    value REAL NOT NULL,
+    percentage REAL NOT NULL,
+    holdingsCount INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+"""
+
+class SQLitePortfolioStore:
+    def __init__(self, db_path: str, pool_size: int = 4, timeout: float = 10.0):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        # Seconds to wait for a free pooled connection before giving up
+        self.timeout = timeout
+        self._pool: Optional[queue.Queue] = None
+        self._pool_lock = threading.Lock()
+
+    # ---------- Connections ----------
+
+    def _connect_writer(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        # WAL lets the read pool keep serving while an import is running
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        # Databases created before multi-currency support lack the currency column
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(holdings)")}
+        if 'currency' not in columns:
+            conn.execute(f"ALTER TABLE holdings ADD COLUMN currency TEXT NOT NULL DEFAULT '{BASE_CURRENCY}'")
+        return conn
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection from the pool"""
+        with self._pool_lock:
+            if self._pool is None:
+                if not os.path.exists(self.db_path):
+                    raise FileNotFoundError(f"Portfolio database not found: {self.db_path}")
+                pool: queue.Queue = queue.Queue(maxsize=self.pool_size)
+                for _ in range(self.pool_size):
+                    pool.put(self._connect_reader())
+                self._pool = pool
+            pool = self._pool
+
+        try:
+            conn = pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free database connection after {self.timeout}s "
+                               f"(pool size {self.pool_size})") from None
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    def close(self) -> None:
+        """Close pooled read connections (they are reopened on next use)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        # Connections still borrowed go back to the detached pool and are
+        # garbage collected with it
+        while pool is not None and not pool.empty():
+            pool.get_nowait().close()
+
+    # ---------- Writes ----------
+
+    def import_data(self, data: Dict[str, Any]) -> Dict[str, int]:
+        """Upsert a processed portfolio in one transaction, touching only changed rows"""
+        conn = self._connect_writer()
+        try:
+            with conn:
+                stats = {
+                    'holdings_changed': self._upsert_holdings(conn, data.get('holdings', [])),
+                    'timeline_changed': self._upsert_timeline(conn, data.get('historical_performance', [])),
+                    'allocation_changed': self._upsert_allocation(conn, data),
+                }
+                metadata = data.get('metadata', {})
+                conn.executemany(
+                    "INSERT INTO metadata(key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value "
+                    "WHERE metadata.value IS NOT excluded.value",
+                    [(key, str(value)) for key, value in metadata.items()]
+                )
+            return stats
+        finally:
+            conn.close()
+
+    def _upsert_holdings(self, conn: sqlite3.Connection, holdings: List[Dict[str, Any]]) -> int:
+        rows = [self._holding_row(h, position) for position, h in enumerate(holdings)]
+        return self._sync_table(conn, 'holdings', 'symbol', HOLDING_COLUMNS + ['position'], rows, ordering='position')
+
+    def _upsert_timeline(self, conn: sqlite3.Connection, timeline: List[Dict[str, Any]]) -> int:
+        rows = [tuple(point.get(c) for c in TIMELINE_COLUMNS) for point in timeline]
+        return self._sync_table(conn, 'timeline', 'date', TIMELINE_COLUMNS, rows)
+
+    def _upsert_allocation(self, conn: sqlite3.Connection, data: Dict[str, Any]) -> int:
+        changed = 0
+        for column, (table, source) in ALLOCATION_TABLES.items():
+            rows = [
+                (item[column], item.get('value', 0), item.get('percentage', 0), item.get('holdingsCount', 0), position)
+                for position, item in enumerate(data.get(source, []))
+            ]
+            changed += self._sync_table(conn, table, column, [column] + ALLOCATION_COLUMNS, rows, ordering='position')
+        return changed
+
+    @staticmethod
+    def _sync_table(conn: sqlite3.Connection, table: str, key: str, columns: List[str], rows: List[Tuple],
+                    ordering: Optional[str] = None) -> int:
+        """Make a table match rows (key first); return the number of rows inserted, updated or deleted.
+
+        The optional ordering column (last in each row) is kept in sync but a
+        row that only moved is not counted as changed.
+        """
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != key)
+        # Only rewrite a row when one of its values actually differs
+        differs = ' OR '.join(f"{table}.{c} IS NOT excluded.{c}" for c in columns if c not in (key, ordering))
+        upsert = (
+            f"INSERT INTO {table}({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates} WHERE {differs}"
+        )
+
+        before = conn.total_changes
+        conn.executemany(upsert, rows)
+        changed = conn.total_changes - before
+
+        if ordering:
+            # Rows shifted by an insert or delete elsewhere only get a new position
+            conn.executemany(
+                f"UPDATE {table} SET {ordering} = ? WHERE {key} = ? AND {ordering} IS NOT ?",
+                ((row[-1], row[0], row[-1]) for row in rows)
+            )
+
+        # Drop rows that are no longer in the source
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS incoming_{table} (key TEXT PRIMARY KEY)")
+        conn.execute(f"DELETE FROM incoming_{table}")
+        conn.executemany(f"INSERT OR IGNORE INTO incoming_{table}(key) VALUES (?)", ((row[0],) for row in rows))
+        before = conn.total_changes
+        conn.execute(f"DELETE FROM {table} WHERE {key} NOT IN (SELECT key FROM incoming_{table})")
+        return changed + conn.total_changes - before
+
+    @staticmethod
+    def _holding_row(holding: Dict[str, Any], position: int) -> Tuple:
+        value = holding.get('value', round(holding['quantity'] * holding['currentPrice'], 2))
+        invested = holding.get('invested', round(holding['quantity'] * holding['avgPrice'], 2))
+        return (
+            # Stored upper-case so lookups can normalise the same way
+            str(holding['symbol']).strip().upper(),
+            holding['name'],
+            holding['quantity'],
+            holding['avgPrice'],
+            holding['currentPrice'],
+            holding['sector'],
+            holding['marketCap'],
+            holding.get('exchange', 'NSE'),
+            currency_for(holding),
+            value,
+            invested,
+            holding.get('gainLoss', round(value - invested, 2)),
+            holding.get('gainLossPercent', 0),
+            position,
+        )
+
+    # ---------- Reads ----------
+
+    def get_metadata(self) -> Dict[str, str]:
+        with self._read() as conn:
+            return {row['key']: row['value'] for row in conn.execute("SELECT key, value FROM metadata")}
+
+    @staticmethod
+    def _fx_case(fx_factors: Optional[Dict[str, float]]) -> Tuple[str, List[Any]]:
+        """SQL expression giving each row's FX factor, or ('', []) if every factor is 1.
+
+        fx_factors must cover every listing currency in the table; a currency
+        missing from it yields NULL rather than being treated as unconverted.
+        """
+        factors = fx_factors or {}
+        if all(f == 1.0 for f in factors.values()):
+            return "", []
+        params: List[Any] = []
+        for currency, factor in factors.items():
+            params += [currency, factor]
+        return f"CASE currency {' '.join('WHEN ? THEN ?' for _ in factors)} ELSE NULL END", params
+
+    def _select_holdings(self, fx_factors: Optional[Dict[str, float]]) -> Tuple[str, List[Any]]:
+        """Holding column list with amounts converted in SQL and rounded for output"""
+        case, case_params = self._fx_case(fx_factors)
+        if not case:
+            return ', '.join(HOLDING_COLUMNS), []
+        columns, params = [], []
+        for column in HOLDING_COLUMNS:
+            if column in MONETARY_FIELDS:
+                columns.append(f"ROUND(holdings.{column} * {case}, 2) AS {column}")
+                params += case_params
+            else:
+                columns.append(column)
+        return ', '.join(columns), params
+
+    def get_holding(self, symbol: str, fx_factors: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+        select, params = self._select_holdings(fx_factors)
+        with self._read() as conn:
+            row = conn.execute(
+                f"SELECT {select} FROM holdings WHERE symbol = ?",
+                params + [symbol.strip().upper()]
+            ).fetchone()
+            return dict(row) if row else None
+
+    def _where(self, sector: Optional[str], market_cap: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if sector:
+            clauses.append("sector = ?")
+            params.append(sector)
+        if market_cap:
+            clauses.append("marketCap = ?")
+            params.append(market_cap)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query_holdings(self, sector: Optional[str] = None, market_cap: Optional[str] = None,
+                       sort_by: Optional[str] = None, descending: bool = False,
+                       limit: Optional[int] = None, offset: int = 0,
+                       fx_factors: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Filter, sort and paginate holdings in SQL, converting amounts by the per-currency fx_factors"""
+        if sort_by is not None and sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by: {sort_by}")
+
+        select, params = self._select_holdings(fx_factors)
+        where, where_params = self._where(sector, market_cap)
+        params += where_params
+        order = "position"
+        if sort_by:
+            sort_expr = sort_by
+            case, case_params = self._fx_case(fx_factors)
+            if sort_by in MONETARY_COLUMNS and case:
+                # Sort on unrounded converted amounts, like the JSON backend
+                sort_expr = f"holdings.{sort_by} * {case}"
+                params += case_params
+            order = f"{sort_expr} {'DESC' if descending else 'ASC'}, position"
+        sql = f"SELECT {select} FROM holdings{where} ORDER BY {order}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit if limit is not None else -1, offset]
+
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def iter_holdings(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield all holdings in source order without materialising the table"""
+        # A connection is borrowed per page rather than for the whole
+        # iteration, so a slow streaming client cannot starve the pool
+        sql = (f"SELECT {', '.join(HOLDING_COLUMNS)}, position FROM holdings "
+               f"WHERE position > ? ORDER BY position LIMIT ?")
+        last_position = -1
+        while True:
+            with self._read() as conn:
+                rows = conn.execute(sql, (last_position, batch_size)).fetchall()
+            if not rows:
+                break
+            last_position = rows[-1]['position']
+            for row in rows:
+                record = dict(row)
+                del record['position']
+                yield record
+
+    def iter_index_rows(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield (symbol, name, sector) for building the search index"""
+        with self._read() as conn:
+            yield from conn.execute("SELECT symbol, name, sector FROM holdings ORDER BY position")
+
+    def aggregate(self, column: str) -> List[Dict[str, Any]]:
+        """Sum holding value and count holdings grouped by sector or market cap, and by currency"""
+        if column not in AGGREGATE_COLUMNS:
+            raise ValueError(f"Cannot aggregate by: {column}")
+        with self._read() as conn:
+            rows = conn.execute(
+                f"SELECT {column} AS key, currency, SUM(value) AS value, COUNT(*) AS count "
+                f"FROM holdings GROUP BY {column}, currency ORDER BY MIN(position)"
+            )
+            return [dict(row) for row in rows]
+
+    def get_allocation_sheet(self, column: str) -> List[Dict[str, Any]]:
+        """Pre-calculated allocation rows for sector or market cap, in source order"""
+        if column not in ALLOCATION_TABLES:
+            raise ValueError(f"No allocation sheet for: {column}")
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(
+                f"SELECT {column}, {', '.join(ALLOCATION_COLUMNS[:-1])} FROM {ALLOCATION_TABLES[column][0]} "
+                f"ORDER BY position"
+            )]
+
+    def listing_currencies(self) -> List[str]:
+        """Distinct listing currencies of the stored holdings"""
+        with self._read() as conn:
+            return [row['currency'] for row in conn.execute("SELECT DISTINCT currency FROM holdings")]
+
+    def value_by_currency(self) -> Dict[str, float]:
+        """Total holding value per listing currency"""
+        with self._read() as conn:
+            return {row['currency']: row['value'] for row in conn.execute(
+                "SELECT currency, SUM(value) AS value FROM holdings GROUP BY currency"
+            )}
+
+    def summary_stats(self) -> Dict[str, Any]:
+        """Totals, extremes and sector count for the summary endpoint"""
+        with self._read() as conn:
+            totals = conn.execute(
+                "SELECT COUNT(*) AS count, COUNT(DISTINCT sector) AS sectors FROM holdings"
+            ).fetchone()
+            # Amounts stay per currency; the caller converts and sums them
+            by_currency = [dict(row) for row in conn.execute(
+                "SELECT currency, SUM(value) AS total_value, SUM(quantity * avgPrice) AS total_invested "
+                "FROM holdings GROUP BY currency"
+            )]
+            # Ties resolve to the earliest holding, matching a stable Python sort
+            top = conn.execute(
+                "SELECT symbol, name, gainLossPercent FROM holdings "
+                "ORDER BY gainLossPercent DESC, position ASC LIMIT 1"
+            ).fetchone()
+            worst = conn.execute(
+                "SELECT symbol, name, gainLossPercent FROM holdings "
+                "ORDER BY gainLossPercent ASC, position DESC LIMIT 1"
+            ).fetchone()
+            return {
+                **dict(totals),
+                'by_currency': by_currency,
+                'top': dict(top) if top else None,
+                'worst': dict(worst) if worst else None,
+            }
+
+    def get_timeline(self) -> List[Dict[str, Any]]:
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(
+                f"SELECT {', '.join(TIMELINE_COLUMNS)} FROM timeline ORDER BY date"
+            )]
@@ -0,0 +1,142 @@
+"""
+Delta Sync
+Versions portfolio snapshots and keeps a bounded ring buffer of recent
+changes so polling clients can fetch only what changed since their version.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+class SnapshotChange:
+    """Differences between one snapshot and the snapshot before it"""
+    __slots__ = ('base_version', 'version', 'added', 'changed', 'removed', 'timeline_upserted', 'timeline_removed')
+
+    def __init__(self, base_version: int, version: int):
+        self.base_version = base_version
+        self.version = version
+        self.added: Dict[str, Dict[str, Any]] = {}
+        self.changed: Dict[str, Dict[str, Any]] = {}
+        self.removed: List[str] = []
+        self.timeline_upserted: Dict[str, Dict[str, Any]] = {}
+        self.timeline_removed: List[str] = []
+
+    def __len__(self) -> int:
+        """Number of rows retained for this change"""
+        return (len(self.added) + len(self.changed) + len(self.removed) +
+                len(self.timeline_upserted) + len(self.timeline_removed))
+
+class ChangeLog:
+    def __init__(self, max_changes: int = 64, max_rows: int = 100_000, resync_fraction: float = 0.5):
+        # Oldest entries fall off once either the entry or the total row
+        # budget is exceeded; clients further behind must resync fully
+        self.max_changes = max_changes
+        self.max_rows = max_rows
+        # A net holdings delta bigger than this share of the book is sent
+        # as a full resync instead
+        self.resync_fraction = resync_fraction
+        self._changes: deque = deque()
+        self._retained_rows = 0
+        self._lock = threading.Lock()
+        self.version = 0
+        # Compact fingerprints of the current snapshot, used to diff the next one
+        self._holding_hashes: Dict[str, int] = {}
+        self._timeline_hashes: Dict[str, int] = {}
+
+    def record(self, holdings: List[Dict[str, Any]], timeline: List[Dict[str, Any]]) -> int:
+        """Diff a new snapshot against the previous one, log the change and return the new version"""
+        holding_hashes = {h['symbol']: hash(tuple(h.values())) for h in holdings}
+        timeline_hashes = {p['date']: hash(tuple(p.values())) for p in timeline}
+
+        with self._lock:
+            # Seeded from the clock so versions keep increasing across restarts
+            version = max(self.version + 1, time.time_ns() // 1_000_000)
+
+            if self.version:
+                change = SnapshotChange(self.version, version)
+                for holding in holdings:
+                    previous = self._holding_hashes.get(holding['symbol'])
+                    if previous is None:
+                        change.added[holding['symbol']] = holding
+                    elif previous != holding_hashes[holding['symbol']]:
+                        change.changed[holding['symbol']] = holding
+                change.removed = [s for s in self._holding_hashes if s not in holding_hashes]
+
+                for point in timeline:
+                    if self._timeline_hashes.get(point['date']) != timeline_hashes[point['date']]:
+                        change.timeline_upserted[point['date']] = point
+                change.timeline_removed = [d for d in self._timeline_hashes if d not in timeline_hashes]
+
+                self._changes.append(change)
+                self._retained_rows += len(change)
+                while self._changes and (len(self._changes) > self.max_changes or
+                                         self._retained_rows > self.max_rows):
+                    self._retained_rows -= len(self._changes.popleft())
+
+            self._holding_hashes = holding_hashes
+            self._timeline_hashes = timeline_hashes
+            self.version = version
+            return version
+
+    def _changes_since(self, since: int) -> Optional[List[SnapshotChange]]:
+        """Changes after `since`, or None if the buffer no longer reaches back that far"""
+        with self._lock:
+            if since == self.version:
+                return []
+            changes = [c for c in self._changes if c.version > since]
+        # The chain must start exactly at the client's version; anything else
+        # is an expired, unknown or future version
+        if not changes or changes[0].base_version != since:
+            return None
+        return changes
+
+    def holdings_since(self, since: int) -> Optional[Dict[str, List[Any]]]:
+        """Net added/changed/removed holdings after `since`, or None if a full resync is needed or cheaper"""
+        changes = self._changes_since(since)
+        if changes is None:
+            return None
+
+        # Whether the client held a symbol follows from the first event seen for it
+        held_by_client: Dict[str, bool] = {}
+        latest: Dict[str, Optional[Dict[str, Any]]] = {}
+        for change in changes:
+            for symbol, holding in change.added.items():
+                held_by_client.setdefault(symbol, False)
+                latest[symbol] = holding
+            for symbol, holding in change.changed.items():
+                held_by_client.setdefault(symbol, True)
+                latest[symbol] = holding
+            for symbol in change.removed:
+                held_by_client.setdefault(symbol, True)
+                latest[symbol] = None
+
+        delta: Dict[str, List[Any]] = {'added': [], 'changed': [], 'removed': []}
+        for symbol, holding in latest.items():
+            if holding is None:
+                if held_by_client[symbol]:
+                    delta['removed'].append(symbol)
+            elif held_by_client[symbol]:
+                delta['changed'].append(holding)
+            else:
+                delta['added'].append(holding)
+
+        if sum(len(rows) for rows in delta.values()) > self.resync_fraction * max(len(self._holding_hashes), 1):
+            return None
+        return delta
+
+    def timeline_since(self, since: int) -> Optional[Dict[str, List[Any]]]:
+        """Net upserted points and removed dates after `since`, or None if a full resync is needed"""
+        changes = self._changes_since(since)
+        if changes is None:
+            return None
+
+        latest: Dict[str, Optional[Dict[str, Any]]] = {}
+        for change in changes:
+            latest.update(change.timeline_upserted)
+            for date in change.timeline_removed:
+                latest[date] = None
+
+        upserted = sorted((p for p in latest.values() if p is not None), key=lambda p: p['date'])
+        removed = sorted(date for date, p in latest.items() if p is None)
+        return {'upserted': upserted, 'removed': removed}
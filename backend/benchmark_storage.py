@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Storage Backend Benchmark
+Compares the JSON and SQLite backends on synthetic portfolios
+Usage: python benchmark_storage.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, Any, Callable
+
+from app.data_service import PortfolioDataService
+from app.sqlite_store import SQLitePortfolioStore
+
+SECTORS = ['Technology', 'Banking', 'Energy', 'Healthcare', 'Automotive',
+           'Consumer Goods', 'Financial Services', 'Telecommunications']
+MARKET_CAPS = ['Large', 'Mid', 'Small']
+
+def generate_portfolio(size: int, seed: int = 42) -> Dict[str, Any]:
+    """Build a processed portfolio document with `size` synthetic holdings"""
+    rng = random.Random(seed)
+    holdings = []
+    for i in range(size):
+        quantity = rng.randint(1, 500)
+        avg_price = round(rng.uniform(50, 5000), 2)
+        current_price = round(avg_price * rng.uniform(0.6, 1.6), 2)
+        value = round(quantity * current_price, 2)
+        invested = round(quantity * avg_price, 2)
+        holdings.append({
+            'symbol': f"SYM{i:07d}",
+            'name': f"Company {i} Limited",
+            'quantity': quantity,
+            'avgPrice': avg_price,
+            'currentPrice': current_price,
+            'sector': rng.choice(SECTORS),
+            'marketCap': rng.choice(MARKET_CAPS),
+            'exchange': 'NSE',
+            'value': value,
+            'invested': invested,
+            'gainLoss': round(value - invested, 2),
+            'gainLossPercent': round((value - invested) / invested * 100, 2),
+        })
+
+    timeline = [
+        {'date': f"2024-{month:02d}-01", 'portfolio': 1500000 + month * 25000,
+         'nifty50': 21000 + month * 400, 'gold': 62000 + month * 1100}
+        for month in range(1, 13)
+    ]
+
+    return {
+        'metadata': {'imported_at': '2024-12-01T00:00:00', 'source_file': 'benchmark', 'version': '1.0'},
+        'holdings': holdings,
+        'historical_performance': timeline,
+        'sector_allocation': [],
+        'market_cap_allocation': [],
+        'summary_metrics': {}
+    }
+
+def timed(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """Best-of-N wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def run_scenarios(service: PortfolioDataService) -> Dict[str, float]:
+    return {
+        'first request (load)': timed(lambda: service.get_holding('SYM0000000'), repeat=1),
+        'holding by symbol': timed(lambda: service.get_holding('SYM0000123')),
+        'filter+sort+page': timed(lambda: service.get_holdings(sector='Banking', market_cap='Mid', sort_by='value',
+                                                               descending=True, limit=50, offset=100)),
+        # get_allocation/get_summary are cached per snapshot, so time the computation itself
+        'allocation': timed(lambda: service._compute_allocation(service.fx.base)),
+        'summary': timed(lambda: service._compute_summary(service.fx.base)),
+    }
+
+def benchmark_size(size: int, work_dir: str) -> Dict[str, Dict[str, float]]:
+    print(f"\n📦 Generating {size:,} holdings...")
+    data = generate_portfolio(size)
+
+    json_file = os.path.join(work_dir, f'portfolio_{size}.json')
+    with open(json_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    db_file = os.path.join(work_dir, f'portfolio_{size}.db')
+    start = time.perf_counter()
+    SQLitePortfolioStore(db_file).import_data(data)
+    print(f"   SQLite import: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # A second import with one price moved exercises the changed-rows-only upsert
+    data['holdings'][0]['currentPrice'] += 1
+    start = time.perf_counter()
+    stats = SQLitePortfolioStore(db_file).import_data(data)
+    print(f"   SQLite re-import ({stats['holdings_changed']} row changed): "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    del data
+
+    json_service = PortfolioDataService()
+    json_service.json_file = json_file
+    json_service._store = None
+
+    sqlite_service = PortfolioDataService()
+    sqlite_service._store = SQLitePortfolioStore(db_file)
+
+    return {'json': run_scenarios(json_service), 'sqlite': run_scenarios(sqlite_service)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs SQLite storage backends")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print("⏱️  Storage Backend Benchmark")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in args.sizes:
+            results = benchmark_size(size, work_dir)
+            print(f"\n📊 {size:,} holdings (best of 3, ms)")
+            print(f"   {'scenario':<22}{'json':>12}{'sqlite':>12}")
+            for scenario in results['json']:
+                print(f"   {scenario:<22}{results['json'][scenario]:>12.2f}{results['sqlite'][scenario]:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,21 @@ Run this script whenever the Excel file is updated
 """
 
 import pandas as pd
+import argparse
 import json
 import os
 from datetime import datetime
 from typing import Dict, Any, List
 
+from app.sqlite_store import SQLitePortfolioStore
+from app.fx_service import currency_for
+
 class DataImporter:
     def __init__(self):
         self.data_dir = os.path.join(os.path.dirname(__file__), 'data')
         self.excel_file = os.path.join(self.data_dir, 'Sample Portfolio Dataset for Assignment.xlsx')
         self.json_file = os.path.join(self.data_dir, 'portfolio_data.json')
+        self.db_file = os.getenv('PORTFOLIO_DB', os.path.join(self.data_dir, 'portfolio_data.db'))
         self.backup_dir = os.path.join(self.data_dir, 'backups')
         
         # Ensure directories exist
@@ -70,6 +75,11 @@ class DataImporter:
                 'marketCap': market_cap.strip(),
                 'exchange': str(row.get('Exchange', 'NSE')).strip() if pd.notna(row.get('Exchange')) else 'NSE'
             }
+            # Listing currency from the sheet if present, else inferred from the exchange
+            holding['currency'] = currency_for({
+                'currency': str(row['Currency']).strip() if pd.notna(row.get('Currency')) else None,
+                'exchange': holding['exchange']
+            })
             
             # Calculate derived values
             holding['value'] = round(holding['quantity'] * holding['currentPrice'], 2)
@@ -216,7 +226,16 @@ class DataImporter:
         print(f"✅ Saved processed data to: {self.json_file}")
         print(f"📁 File size: {os.path.getsize(self.json_file) / 1024:.1f} KB")
     
-    def import_data(self) -> Dict[str, Any]:
+    def save_sqlite(self, data: Dict[str, Any]) -> None:
+        """Upsert processed data into the SQLite store (only changed rows are written)"""
+        store = SQLitePortfolioStore(self.db_file)
+        stats = store.import_data(data)
+        
+        print(f"✅ Saved processed data to: {self.db_file}")
+        print(f"✏️  Rows changed: {stats['holdings_changed']} holdings, {stats['timeline_changed']} timeline, "
+              f"{stats['allocation_changed']} allocation")
+    
+    def import_data(self, storage: str = 'json') -> Dict[str, Any]:
         """Main import process"""
         print("🚀 Starting data import process...")
         
@@ -224,8 +243,11 @@ class DataImporter:
             # Load and process Excel data
             processed_data = self.load_excel_data()
             
-            # Save to JSON
-            self.save_json(processed_data)
+            # Save to the selected storage backend
+            if storage == 'sqlite':
+                self.save_sqlite(processed_data)
+            else:
+                self.save_json(processed_data)
             
             # Print summary
             self._print_summary(processed_data)
@@ -249,8 +271,14 @@ class DataImporter:
 
 def main():
     """Command line interface"""
+    parser = argparse.ArgumentParser(description="Import portfolio Excel data")
+    parser.add_argument('--storage', choices=['json', 'sqlite'],
+                        default=os.getenv('PORTFOLIO_STORAGE', 'json'),
+                        help="Storage backend to write (default: json)")
+    args = parser.parse_args()
+    
     importer = DataImporter()
-    importer.import_data()
+    importer.import_data(storage=args.storage)
 
 if __name__ == "__main__":
     main()
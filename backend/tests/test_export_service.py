@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from app.data_service import PortfolioDataService
+from app.export_service import PortfolioExporter, EXPORT_COLUMNS
+from app.sqlite_store import SQLitePortfolioStore
+
+PORTFOLIO = {
+    'metadata': {'imported_at': '2024-01-01T00:00:00'},
+    'holdings': [
+        {'symbol': 'INFY', 'name': 'Infosys Limited', 'quantity': 10, 'avgPrice': 100.0, 'currentPrice': 120.0,
+         'sector': 'Technology', 'marketCap': 'Large', 'exchange': 'NSE'},
+        {'symbol': 'HDFCBANK', 'name': 'HDFC Bank Limited', 'quantity': 5, 'avgPrice': 200.0, 'currentPrice': 160.0,
+         'sector': 'Banking', 'marketCap': 'Large', 'exchange': 'NSE'},
+    ],
+    'historical_performance': [
+        {'date': '2024-01-01', 'portfolio': 1000, 'nifty50': 20000, 'gold': 60000},
+        {'date': '2024-02-01', 'portfolio': 1100, 'nifty50': 21000, 'gold': 61000},
+    ],
+}
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    rates = tmp_path / 'fx_rates.json'
+    rates.write_text(json.dumps({'base': 'INR', 'rates': {'INR': 1.0}}))
+    monkeypatch.setenv('FX_RATES_FILE', str(rates))
+    data = tmp_path / 'portfolio_data.json'
+    data.write_text(json.dumps(PORTFOLIO))
+
+    service = PortfolioDataService()
+    service.json_file = str(data)
+    service._store = None
+    return PortfolioExporter(service)
+
+def read_csv(chunks):
+    return list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+
+def test_csv_holdings_has_header_and_computed_columns(exporter):
+    rows = read_csv(exporter.export('csv', ['holdings']))
+    assert rows[0] == EXPORT_COLUMNS['holdings']
+
+    records = [dict(zip(rows[0], row)) for row in rows[1:]]
+    assert [r['symbol'] for r in records] == ['INFY', 'HDFCBANK']
+    infy = records[0]
+    assert float(infy['invested']) == 1000.0
+    assert float(infy['value']) == 1200.0
+    assert float(infy['gainLoss']) == 200.0
+    assert sum(float(r['allocation']) for r in records) == pytest.approx(100.0, abs=0.02)
+
+def test_csv_multiple_sections_are_titled_and_separated(exporter):
+    rows = read_csv(exporter.export('csv', ['holdings', 'performance']))
+    assert rows[0] == ['# holdings']
+    assert rows[1] == EXPORT_COLUMNS['holdings']
+    blank = rows.index([])
+    assert blank == 4
+    assert rows[blank + 1] == ['# performance']
+    assert rows[blank + 2] == EXPORT_COLUMNS['performance']
+    assert rows[blank + 3][0] == '2024-01-01'
+    assert len(rows) == blank + 5
+
+def test_xlsx_opens_with_one_sheet_per_section(exporter):
+    data = b''.join(exporter.export('xlsx', ['holdings', 'performance']))
+    workbook = load_workbook(io.BytesIO(data), read_only=True)
+    assert workbook.sheetnames == ['Holdings', 'Performance']
+
+    holdings = list(workbook['Holdings'].iter_rows(values_only=True))
+    assert list(holdings[0]) == EXPORT_COLUMNS['holdings']
+    assert len(holdings) == 3
+    assert len(list(workbook['Performance'].iter_rows(values_only=True))) == 3
+
+def test_section_parsing(exporter):
+    assert exporter.parse_sections('Performance, holdings,performance') == ['performance', 'holdings']
+    with pytest.raises(ValueError):
+        exporter.parse_sections('holdings,trades')
+    with pytest.raises(ValueError):
+        exporter.export('pdf', ['holdings'])
+
+def test_failures_raise_before_streaming(exporter, tmp_path):
+    # A missing database fails when the export is requested, not mid-stream
+    exporter.data_service._store = SQLitePortfolioStore(str(tmp_path / 'missing.db'))
+    with pytest.raises(FileNotFoundError):
+        exporter.export('csv', ['holdings'])
@@ -0,0 +1,132 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.data_service import PortfolioDataService
+from app.fx_service import FXRateTable, HoldingAmounts, MissingFXRateError, MONETARY_FIELDS
+from app.sqlite_store import SQLitePortfolioStore
+
+RATES = {'base': 'INR', 'rates': {'INR': 1.0, 'USD': 83.0, 'EUR': 90.0}}
+
+HOLDINGS = [
+    {'symbol': 'INFY', 'name': 'Infosys Limited', 'quantity': 10, 'avgPrice': 1500.0, 'currentPrice': 1800.0,
+     'sector': 'Technology', 'marketCap': 'Large', 'exchange': 'NSE', 'gainLossPercent': 20.0},
+    {'symbol': 'AAPL', 'name': 'Apple Inc', 'quantity': 7, 'avgPrice': 150.123, 'currentPrice': 200.0,
+     'sector': 'Technology', 'marketCap': 'Large', 'exchange': 'NASDAQ', 'gainLossPercent': 33.2},
+    {'symbol': 'HDFCBANK', 'name': 'HDFC Bank Limited', 'quantity': 3, 'avgPrice': 1650.0, 'currentPrice': 1580.3,
+     'sector': 'Banking', 'marketCap': 'Mid', 'exchange': 'NSE', 'gainLossPercent': -4.2},
+]
+
+def write_json(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+@pytest.fixture
+def services(tmp_path, monkeypatch):
+    """JSON and SQLite services over the same book, rates and override file"""
+    def build(holdings=HOLDINGS):
+        monkeypatch.setenv('FX_RATES_FILE', write_json(tmp_path / 'fx_rates.json', RATES))
+        monkeypatch.setenv('FX_RATES_OVERRIDE_FILE', str(tmp_path / 'fx_rates.local.json'))
+        data = {'metadata': {'imported_at': '2024-01-01'}, 'holdings': holdings, 'historical_performance': []}
+
+        json_service = PortfolioDataService()
+        json_service.json_file = write_json(tmp_path / 'portfolio_data.json', data)
+        json_service._store = None
+
+        db_file = str(tmp_path / 'portfolio.db')
+        SQLitePortfolioStore(db_file).import_data(data)
+        sqlite_service = PortfolioDataService()
+        sqlite_service._store = SQLitePortfolioStore(db_file)
+        return json_service, sqlite_service
+    return build
+
+def test_holding_amounts_group_rows_by_currency():
+    amounts = HoldingAmounts(HOLDINGS)
+    assert amounts.matrix.shape == (3, len(MONETARY_FIELDS))
+    assert list(amounts.groups['INR']) == [0, 2]
+    assert list(amounts.groups['USD']) == [1]
+    # Missing computed fields are derived from quantity and prices
+    assert amounts.matrix[1, HoldingAmounts.column('value')] == 1400.0
+    assert amounts.matrix[1, HoldingAmounts.column('invested')] == round(7 * 150.123, 2)
+
+def test_convert_amounts_multiplies_each_group_at_full_precision(tmp_path):
+    fx = FXRateTable(write_json(tmp_path / 'fx.json', RATES))
+    amounts = HoldingAmounts(HOLDINGS)
+    # Nothing to convert: the original matrix comes back untouched
+    inr_only = HoldingAmounts(HOLDINGS[:1])
+    assert fx.convert_amounts(inr_only, 'INR') is inr_only.matrix
+
+    converted = fx.convert_amounts(amounts, 'USD')
+    np.testing.assert_allclose(converted[0], amounts.matrix[0] / 83.0)
+    np.testing.assert_array_equal(converted[1], amounts.matrix[1])
+    assert converted[1, 0] == 150.123
+
+def test_missing_listing_rate_is_a_server_error(tmp_path):
+    fx = FXRateTable(write_json(tmp_path / 'fx.json', RATES))
+    with pytest.raises(MissingFXRateError, match='AUD'):
+        fx.factor('AUD', 'INR')
+    # An unknown reporting currency is the client's mistake
+    with pytest.raises(ValueError):
+        fx.resolve('XYZ')
+
+def test_invalid_rates_file_keeps_current_table(tmp_path):
+    path = tmp_path / 'fx.json'
+    fx = FXRateTable(write_json(path, RATES))
+    version = fx.version
+
+    write_json(path, {'base': 'INR', 'rates': {'USD': 0}})
+    fx.load()
+    assert fx.rates['USD'] == 83.0
+    assert fx.version == version
+
+    # A bad file at startup leaves only the base rate instead of raising
+    assert FXRateTable(str(path)).rates == {'INR': 1.0}
+
+def test_pushed_rates_persist_to_overrides_file(tmp_path):
+    defaults = tmp_path / 'fx.json'
+    overrides = tmp_path / 'fx.local.json'
+    fx = FXRateTable(write_json(defaults, RATES), str(overrides))
+    fx.update({'usd': 85.0})
+
+    assert json.loads(defaults.read_text()) == RATES
+    assert json.loads(overrides.read_text())['rates'] == {'USD': 85.0}
+    assert not (tmp_path / 'fx.local.json.tmp').exists()
+
+    reloaded = FXRateTable(str(defaults), str(overrides))
+    assert reloaded.rates == {'INR': 1.0, 'USD': 85.0, 'EUR': 90.0}
+
+def test_backends_agree_on_converted_values(services):
+    json_service, sqlite_service = services()
+    for currency in ('INR', 'USD', 'EUR'):
+        results = []
+        for service in (json_service, sqlite_service):
+            results.append((
+                [h.model_dump() for h in service.get_holdings(currency=currency)],
+                [h.model_dump() for h in service.get_holdings(sort_by='value', descending=True, currency=currency)],
+                service.get_holding('aapl', currency=currency).model_dump(),
+                service.get_summary(currency).model_dump(),
+                service.get_allocation(currency).model_dump(),
+            ))
+        assert results[0] == results[1], currency
+
+    # Totals use full-precision prices, not the rounded output
+    summary = json_service.get_summary('INR')
+    assert summary.totalInvested == round(10 * 1500 + 7 * 150.123 * 83 + 3 * 1650, 2)
+
+def test_converted_results_refresh_when_rates_change(services):
+    for service in services():
+        before = service.get_summary('USD').totalValue
+        service.update_fx_rates({'USD': 100.0})
+        assert service.get_summary('USD').totalValue != before
+        assert service.get_holdings(currency='USD')[0].value == round(18000 / 100, 2)
+
+def test_missing_listing_rate_fails_the_same_on_both_backends(services):
+    holdings = HOLDINGS + [{**HOLDINGS[0], 'symbol': 'BHP', 'exchange': 'ASX', 'currency': 'AUD'}]
+    for service in services(holdings):
+        for call in (lambda: service.get_holdings(),
+                     lambda: service.get_holdings(currency='USD'),
+                     lambda: service.get_summary(),
+                     lambda: service.get_allocation('USD')):
+            with pytest.raises(MissingFXRateError, match='AUD'):
+                call()
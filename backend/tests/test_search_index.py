@@ -0,0 +1,72 @@
+from app.search_index import HoldingsIndex, PackedStrings, EXACT_SCORE, SYMBOL_PREFIX_SCORE, NAME_PREFIX_SCORE
+
+ROWS = [
+    ('INFY', 'Infosys Limited', 'Technology'),
+    ('HDFCBANK', 'HDFC Bank Limited', 'Banking'),
+    ('TCS', 'Tata Consultancy Services', 'Technology'),
+    ('TATAMOTORS', 'Tata Motors Ltd', 'Automotive'),
+    ('ICICIBANK', 'ICICI Bank Limited', 'Banking'),
+]
+
+def symbols(index, results):
+    return [index.record(position)['symbol'] for position, _ in results]
+
+def test_packed_strings_round_trip():
+    packed = PackedStrings(['', 'ab', 'c', 'def'])
+    assert len(packed) == 4
+    assert [packed[i] for i in range(4)] == ['', 'ab', 'c', 'def']
+
+def test_get_position_is_case_insensitive():
+    index = HoldingsIndex(ROWS)
+    assert index.get_position('hdfcbank') == 1
+    assert index.get_position(' Tcs ') == 2
+    assert index.get_position('NOPE') is None
+    assert index.record(1) == {'symbol': 'HDFCBANK', 'name': 'HDFC Bank Limited', 'sector': 'Banking'}
+
+def test_exact_symbol_ranks_above_prefix_matches():
+    index = HoldingsIndex(ROWS)
+    results = index.search('tcs')
+    assert results[0] == (2, EXACT_SCORE)
+
+    results = index.search('TATA')
+    # Symbol prefix (TATAMOTORS) outranks the name-word prefix (Tata Consultancy)
+    assert symbols(index, results) == ['TATAMOTORS', 'TCS']
+    assert SYMBOL_PREFIX_SCORE <= results[0][1] < EXACT_SCORE
+    assert NAME_PREFIX_SCORE <= results[1][1] < SYMBOL_PREFIX_SCORE
+
+def test_name_word_prefix_and_multi_word_queries():
+    index = HoldingsIndex(ROWS)
+    assert set(symbols(index, index.search('bank'))) == {'HDFCBANK', 'ICICIBANK'}
+    assert symbols(index, index.search('hdfc  B')) == ['HDFCBANK']
+    assert symbols(index, index.search('tata motors')) == ['TATAMOTORS']
+    # Words must be adjacent and in order from a word boundary
+    assert index.search('bank hdfc') == []
+    assert index.search('ata') == []
+
+def test_limit_and_empty_queries():
+    index = HoldingsIndex(ROWS)
+    assert len(index.search('limited', limit=2)) == 2
+    assert index.search('   ') == []
+    assert index.search('infy', limit=0) == []
+
+def test_fuzzy_matches_typos_only_when_asked():
+    index = HoldingsIndex(ROWS)
+    assert index.search('infosis') == []
+    results = index.search('infosis', fuzzy=True)
+    assert symbols(index, results) == ['INFY']
+    assert results[0][1] < NAME_PREFIX_SCORE
+
+def test_fuzzy_window_is_bounded():
+    rows = [(f'S{i:05d}', f'Company {i:05d}', 'Sector') for i in range(5000)]
+    index = HoldingsIndex(rows, max_fuzzy_candidates=10)
+    # Prefix matches are unaffected by the fuzzy window
+    assert len(index.search('company', limit=50)) == 50
+    assert len(index.search('compnay', limit=5, fuzzy=True)) <= 5
+
+def test_common_token_postings_are_shared():
+    rows = [(f'S{i}', f'Firm{i} Limited', 'Sector') for i in range(100)]
+    index = HoldingsIndex(rows)
+    # "limited" is stored once with one posting per holding
+    assert len(index._tokens) == 101
+    assert len(index._postings) == 200
+    assert len(index.search('limited', limit=20)) == 20
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from app.sqlite_store import SQLitePortfolioStore, SCHEMA
+
+COLUMNS = ['date', 'portfolio', 'nifty50', 'gold', 'portfolioReturn', 'niftyReturn', 'goldReturn']
+
+def point(date, portfolio=100.0):
+    return (date, portfolio, 200.0, 300.0, None, None, None)
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:')
+    conn.executescript(SCHEMA)
+    yield conn
+    conn.close()
+
+def sync(conn, rows):
+    return SQLitePortfolioStore._sync_table(conn, 'timeline', 'date', COLUMNS, rows)
+
+def test_sync_table_counts_inserts(conn):
+    assert sync(conn, [point('2024-01-01'), point('2024-02-01')]) == 2
+
+def test_sync_table_skips_unchanged_rows(conn):
+    rows = [point('2024-01-01'), point('2024-02-01')]
+    sync(conn, rows)
+    assert sync(conn, rows) == 0
+
+def test_sync_table_counts_updates_and_deletes(conn):
+    sync(conn, [point('2024-01-01'), point('2024-02-01'), point('2024-03-01')])
+    # One value changed, one row dropped, one row added
+    changed = sync(conn, [point('2024-01-01'), point('2024-02-01', 150.0), point('2024-04-01')])
+    assert changed == 3
+    dates = [row[0] for row in conn.execute("SELECT date FROM timeline ORDER BY date")]
+    assert dates == ['2024-01-01', '2024-02-01', '2024-04-01']
+
+def test_sync_table_empty_source_deletes_everything(conn):
+    sync(conn, [point('2024-01-01'), point('2024-02-01')])
+    assert sync(conn, []) == 2
+    assert conn.execute("SELECT COUNT(*) FROM timeline").fetchone()[0] == 0
+
+def holding(symbol, price=10.0):
+    return {'symbol': symbol, 'name': symbol.title(), 'quantity': 1, 'avgPrice': 5.0,
+            'currentPrice': price, 'sector': 'Technology', 'marketCap': 'Large'}
+
+def test_import_reports_changed_rows_and_normalises_symbols(tmp_path):
+    store = SQLitePortfolioStore(str(tmp_path / 'portfolio.db'))
+    stats = store.import_data({'holdings': [holding('infy'), holding('TCS')]})
+    assert stats['holdings_changed'] == 2
+
+    stats = store.import_data({'holdings': [holding('INFY', 12.0), holding('TCS')]})
+    assert stats['holdings_changed'] == 1
+    assert store.get_holding('Infy')['symbol'] == 'INFY'
+    store.close()
+
+def test_iter_holdings_does_not_hold_a_connection(tmp_path):
+    store = SQLitePortfolioStore(str(tmp_path / 'portfolio.db'), pool_size=1, timeout=1)
+    store.import_data({'holdings': [holding(f'S{i}') for i in range(5)]})
+
+    records = store.iter_holdings(batch_size=2)
+    assert next(records)['symbol'] == 'S0'
+    # With the only pooled connection free between pages, lookups still succeed
+    assert store.get_holding('S3')['symbol'] == 'S3'
+    assert [r['symbol'] for r in records] == ['S1', 'S2', 'S3', 'S4']
+    store.close()
+
+def test_shifted_rows_are_not_counted_as_changed(tmp_path):
+    store = SQLitePortfolioStore(str(tmp_path / 'portfolio.db'))
+    holdings = [holding(f'S{i:03d}') for i in range(100)]
+    store.import_data({'holdings': holdings})
+
+    # A new row at the top moves every other row down one position
+    stats = store.import_data({'holdings': [holding('NEW')] + holdings})
+    assert stats['holdings_changed'] == 1
+    assert [r['symbol'] for r in store.iter_holdings()][:3] == ['NEW', 'S000', 'S001']
+
+    # Dropping the first row moves every other row up again
+    stats = store.import_data({'holdings': holdings})
+    assert stats['holdings_changed'] == 1
+    assert [r['symbol'] for r in store.iter_holdings()][:2] == ['S000', 'S001']
+
+    # Dropping a row in the middle only counts that row
+    stats = store.import_data({'holdings': holdings[:50] + holdings[51:]})
+    assert stats['holdings_changed'] == 1
+    assert [r['symbol'] for r in store.iter_holdings()][49:51] == ['S049', 'S051']
+    store.close()
+
+def test_reordered_allocation_sheet_is_not_counted_as_changed(tmp_path):
+    store = SQLitePortfolioStore(str(tmp_path / 'portfolio.db'))
+    sectors = [{'sector': name, 'value': 1.0, 'percentage': 50.0, 'holdingsCount': 1} for name in ('A', 'B')]
+    assert store.import_data({'sector_allocation': sectors})['allocation_changed'] == 2
+    assert store.import_data({'sector_allocation': sectors[::-1]})['allocation_changed'] == 0
+    assert [row['sector'] for row in store.get_allocation_sheet('sector')] == ['B', 'A']
+    store.close()
@@ -0,0 +1,127 @@
+from app.sync_service import ChangeLog
+
+def holding(symbol, price=10.0):
+    return {'symbol': symbol, 'currentPrice': price}
+
+def book(*symbols):
+    return [holding(s) for s in symbols]
+
+def make_log(**kwargs):
+    # A generous resync fraction keeps the small books below from forcing full resyncs
+    kwargs.setdefault('resync_fraction', 10.0)
+    return ChangeLog(**kwargs)
+
+def test_unchanged_version_has_empty_delta():
+    log = make_log()
+    version = log.record(book('A', 'B'), [])
+    assert log.holdings_since(version) == {'added': [], 'changed': [], 'removed': []}
+
+def test_changes_are_netted_across_versions():
+    log = make_log()
+    since = log.record(book('A', 'B'), [])
+    log.record([holding('A', 11.0), holding('B'), holding('C')], [])
+    log.record([holding('A', 12.0), holding('C')], [])
+
+    delta = log.holdings_since(since)
+    assert delta['added'] == [holding('C')]
+    assert delta['changed'] == [holding('A', 12.0)]
+    assert delta['removed'] == ['B']
+
+def test_added_then_removed_is_not_reported():
+    log = make_log()
+    since = log.record(book('A'), [])
+    log.record(book('A', 'B'), [])
+    log.record(book('A'), [])
+    assert log.holdings_since(since) == {'added': [], 'changed': [], 'removed': []}
+
+def test_removed_then_readded_is_a_change():
+    log = make_log()
+    since = log.record(book('A', 'B'), [])
+    log.record(book('A'), [])
+    log.record([holding('A'), holding('B', 20.0)], [])
+
+    delta = log.holdings_since(since)
+    assert delta == {'added': [], 'changed': [holding('B', 20.0)], 'removed': []}
+
+def test_expired_version_needs_full_resync():
+    log = make_log(max_changes=2)
+    since = log.record(book('A'), [])
+    for price in (11.0, 12.0, 13.0):
+        log.record([holding('A', price)], [])
+    assert log.holdings_since(since) is None
+
+def test_future_and_unknown_versions_need_full_resync():
+    log = make_log()
+    version = log.record(book('A'), [])
+    log.record(book('A', 'B'), [])
+    assert log.holdings_since(log.version + 1) is None
+    assert log.holdings_since(version - 1) is None
+
+def test_oldest_changes_dropped_when_row_budget_exceeded():
+    log = make_log(max_rows=3)
+    first = log.record(book('A'), [])
+    second = log.record(book('A', 'B', 'C'), [])
+    log.record(book('A', 'B', 'C', 'D', 'E'), [])
+
+    # The first change (2 rows) was dropped to fit the second (2 rows)
+    assert log.holdings_since(first) is None
+    assert [h['symbol'] for h in log.holdings_since(second)['added']] == ['D', 'E']
+
+def test_large_delta_is_sent_as_full_resync():
+    log = ChangeLog(resync_fraction=0.5)
+    since = log.record(book('A', 'B', 'C', 'D'), [])
+    log.record([holding(s, 11.0) for s in 'ABC'] + [holding('D')], [])
+    assert log.holdings_since(since) is None
+
+def test_timeline_upserts_and_removals():
+    log = make_log()
+    since = log.record([], [{'date': '2024-01-01', 'portfolio': 1}, {'date': '2024-02-01', 'portfolio': 2}])
+    log.record([], [{'date': '2024-02-01', 'portfolio': 3}, {'date': '2024-03-01', 'portfolio': 4}])
+
+    delta = log.timeline_since(since)
+    assert [p['date'] for p in delta['upserted']] == ['2024-02-01', '2024-03-01']
+    assert delta['removed'] == ['2024-01-01']
+
+def versioned_service(tmp_path, monkeypatch):
+    import json
+    from app.data_service import PortfolioDataService
+
+    rates = tmp_path / 'fx_rates.json'
+    rates.write_text(json.dumps({'base': 'INR', 'rates': {'USD': 83.0}}))
+    monkeypatch.setenv('FX_RATES_FILE', str(rates))
+    monkeypatch.setenv('FX_RATES_OVERRIDE_FILE', str(tmp_path / 'fx_rates.local.json'))
+    data = tmp_path / 'portfolio_data.json'
+    data.write_text(json.dumps({
+        'metadata': {'imported_at': '2024-01-01'},
+        'holdings': [{'symbol': 'INFY', 'name': 'Infosys', 'quantity': 1, 'avgPrice': 1.0, 'currentPrice': 2.0,
+                      'sector': 'Technology', 'marketCap': 'Large'}],
+        'historical_performance': [],
+    }))
+
+    service = PortfolioDataService()
+    service.json_file = str(data)
+    service._store = None
+    recorded = []
+    record = service._changes.record
+    service._changes.record = lambda *args: recorded.append(1) or record(*args)
+    return service, recorded
+
+def test_fx_updates_do_not_refingerprint_the_book(tmp_path, monkeypatch):
+    service, recorded = versioned_service(tmp_path, monkeypatch)
+    version = service.get_version()
+    service.update_fx_rates({'USD': 90.0})
+    assert service.get_version() == version
+    assert len(recorded) == 1
+
+    service.reload_data()
+    assert service.get_version() > version
+    assert len(recorded) == 2
+
+def test_concurrent_requests_record_a_snapshot_once(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    service, recorded = versioned_service(tmp_path, monkeypatch)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        versions = set(pool.map(lambda _: service.get_version(), range(32)))
+    assert len(versions) == 1
+    assert len(recorded) == 1
@@ -7,6 +7,7 @@ export type Holding = {
   currentPrice: number;
   sector: string;
   marketCap: 'Large' | 'Mid' | 'Small';
+  listingCurrency?: string;
   value: number;
   gainLoss: number;
   gainLossPercent: number;
@@ -46,6 +47,84 @@ async function getJSON<T>(path: string): Promise<T> {
   return res.json();
 }
 
+// ---------- Delta sync ----------
+// The backend stamps each snapshot with a version (X-Portfolio-Version) and
+// answers `?since=<version>` with only what changed, so steady-state polls
+// stay tiny. A fullResync marker means we fell too far behind.
+type HoldingsDelta = {
+  version: number;
+  fullResync: boolean;
+  added: Holding[];
+  changed: Holding[];
+  removed: string[];
+};
+
+type PerformanceDelta = {
+  version: number;
+  fullResync: boolean;
+  timeline: Performance['timeline'];
+  removedDates: string[];
+  returns: Partial<Performance['returns']>;
+};
+
+async function getVersioned<T>(path: string): Promise<{ data: T; version: number | null }> {
+  const res = await fetch(`${baseUrl}${path}`);
+  if (!res.ok) throw new Error(`API error ${res.status}`);
+  const header = res.headers.get('X-Portfolio-Version');
+  return { data: await res.json(), version: header ? Number(header) : null };
+}
+
+let holdingsCache: { data: Holding[]; version: number } | null = null;
+let performanceCache: { data: Performance; version: number } | null = null;
+
+async function syncHoldings(): Promise<Holding[]> {
+  if (holdingsCache) {
+    const delta = await getJSON<HoldingsDelta>(`/api/portfolio/holdings?since=${holdingsCache.version}`);
+    if (!delta.fullResync) {
+      if (delta.added.length || delta.changed.length || delta.removed.length) {
+        const removed = new Set(delta.removed);
+        const updates = new Map([...delta.changed, ...delta.added].map(h => [h.symbol, h] as const));
+        const merged = holdingsCache.data
+          .filter(h => !removed.has(h.symbol))
+          .map(h => updates.get(h.symbol) ?? h);
+        const known = new Set(merged.map(h => h.symbol));
+        merged.push(...delta.added.filter(h => !known.has(h.symbol)));
+        holdingsCache = { data: merged, version: delta.version };
+      } else {
+        holdingsCache.version = delta.version;
+      }
+      return holdingsCache.data;
+    }
+  }
+  const { data, version } = await getVersioned<Holding[]>(`/api/portfolio/holdings`);
+  holdingsCache = version === null ? null : { data, version };
+  return data;
+}
+
+async function syncPerformance(): Promise<Performance> {
+  if (performanceCache) {
+    const delta = await getJSON<PerformanceDelta>(`/api/portfolio/performance?since=${performanceCache.version}`);
+    if (!delta.fullResync) {
+      if (delta.timeline.length || delta.removedDates.length) {
+        const removed = new Set(delta.removedDates);
+        const byDate = new Map(performanceCache.data.timeline.filter(t => !removed.has(t.date)).map(t => [t.date, t] as const));
+        delta.timeline.forEach(t => byDate.set(t.date, t));
+        const timeline = [...byDate.values()].sort((a, b) => a.date.localeCompare(b.date));
+        performanceCache = {
+          data: { timeline, returns: { ...performanceCache.data.returns, ...delta.returns } },
+          version: delta.version,
+        };
+      } else {
+        performanceCache.version = delta.version;
+      }
+      return performanceCache.data;
+    }
+  }
+  const { data, version } = await getVersioned<Performance>(`/api/portfolio/performance`);
+  performanceCache = version === null ? null : { data, version };
+  return data;
+}
+
 // ---------- Local mock fallback (mirrors Edge Functions) ----------
 const mockHoldingsBase = [
   { symbol: 'RELIANCE', name: 'Reliance Industries Ltd', quantity: 50, avgPrice: 2450, currentPrice: 2680.5, sector: 'Energy', marketCap: 'Large' as const },
@@ -152,8 +231,8 @@ function mockSummary(): Summary {
 
 // ---------- Public API ----------
 export const PortfolioAPI = {
-  holdings: () => getJSON<Holding[]>(`/api/portfolio/holdings`),
+  holdings: () => syncHoldings(),
   allocation: () => getJSON<Allocation>(`/api/portfolio/allocation`),
-  performance: () => getJSON<Performance>(`/api/portfolio/performance`),
+  performance: () => syncPerformance(),
   summary: () => getJSON<Summary>(`/api/portfolio/summary`),
 };